@@ -6,12 +6,13 @@ import json
 import hashlib
 import asyncio
 import zlib
+import gzip
 import pickle
 import time
-from typing import Dict, Any, Optional, List, Union, Callable, Set
-from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, List, Union, Callable, Set, Awaitable
+from datetime import datetime
 import logging
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, asdict
 from enum import Enum
 from functools import wraps
 import threading
@@ -19,9 +20,11 @@ from contextlib import asynccontextmanager
 
 try:
     import redis.asyncio as redis
+    from redis.utils import HIREDIS_AVAILABLE
     REDIS_AVAILABLE = True
 except ImportError:
     REDIS_AVAILABLE = False
+    HIREDIS_AVAILABLE = False
     redis = None
 
 from app.config import settings
@@ -85,7 +88,7 @@ class CacheConfig:
     compress_threshold_bytes: int = 1024  # Compress data larger than 1KB
     
 
-@dataclass
+@dataclass(slots=True)
 class CacheMetrics:
     """Cache performance metrics"""
     hits: int = 0
@@ -203,12 +206,12 @@ class CacheConfigs:
     )
 
 
-@dataclass 
+@dataclass(slots=True)
 class CacheEntry:
     """Enhanced cache entry with metadata"""
     data: Any
-    created_at: datetime
-    accessed_at: datetime
+    created_at: float  # time.monotonic()
+    accessed_at: float  # time.monotonic()
     ttl_seconds: int
     compressed: bool = False
     compression_type: CompressionType = CompressionType.NONE
@@ -219,16 +222,16 @@ class CacheEntry:
     
     def is_expired(self) -> bool:
         """Check if cache entry is expired"""
-        return datetime.utcnow() > (self.created_at + timedelta(seconds=self.ttl_seconds))
+        return time.monotonic() > self.created_at + self.ttl_seconds
     
     def should_prefetch(self, threshold: float) -> bool:
         """Check if entry should be prefetched"""
-        elapsed = (datetime.utcnow() - self.created_at).total_seconds()
+        elapsed = time.monotonic() - self.created_at
         return elapsed >= (self.ttl_seconds * threshold)
     
     def update_access(self):
         """Update access metadata"""
-        self.accessed_at = datetime.utcnow()
+        self.accessed_at = time.monotonic()
         self.access_count += 1
 
 
@@ -250,7 +253,6 @@ class IntelligentCacheManager:
         self.metrics = CacheMetrics()
         
         # Intelligent features
-        self.access_patterns: Dict[str, List[datetime]] = {}  # Track access patterns
         self.tag_index: Dict[str, Set[str]] = {}  # Tag -> cache keys
         self.dependency_index: Dict[str, Set[str]] = {}  # Dependency -> cache keys
         
@@ -259,6 +261,20 @@ class IntelligentCacheManager:
         self.cleanup_interval = 300  # 5 minutes
         self.prefetch_workers = 2
         
+        # Serializers specialized once per cache level
+        self._serializers: Dict[CacheLevel, Callable[[Dict[str, Any]], tuple]] = {
+            level: self._build_serializer(self._get_config(level)) for level in CacheLevel
+        }
+        
+        # In-flight computations keyed by cache key (single-flight on misses)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        
+        # Write-behind queue: set() enqueues, a single writer flushes in batches
+        self._write_queue: asyncio.Queue = asyncio.Queue(maxsize=10_000)
+        self._writer_task: Optional[asyncio.Task] = None
+        self.write_batch_size = 256
+        self.write_flush_interval = 0.005  # 5ms
+        
         # Threading
         self.lock = asyncio.Lock()
         self.metrics_lock = threading.Lock()
@@ -272,7 +288,15 @@ class IntelligentCacheManager:
         try:
             # Parse Redis URL
             redis_url = settings.redis_url
-            self.redis_client = redis.from_url(redis_url, decode_responses=True)
+            # Raw bytes: compressed payloads are not valid UTF-8.
+            # The async client uses the hiredis C parser automatically when installed.
+            self.redis_client = redis.from_url(
+                redis_url,
+                decode_responses=False,
+                socket_keepalive=True
+            )
+            if not HIREDIS_AVAILABLE:
+                logger.warning("hiredis not installed, Redis replies use the pure-Python parser")
             
             # Test connection
             await self.redis_client.ping()
@@ -309,7 +333,38 @@ class IntelligentCacheManager:
         data_str = json.dumps(base_data, sort_keys=True)
         hash_key = hashlib.md5(data_str.encode()).hexdigest()
         
-        return f"{config.namespace}:{hash_key}"
+        # The target stays readable so clear_target_cache can match it
+        return f"{config.namespace}:{target}:{hash_key}"
+    
+    @staticmethod
+    def _build_serializer(config: CacheConfig) -> Callable[[Dict[str, Any]], tuple]:
+        """Build a serializer with the config's compression settings bound in"""
+        dumps = json.dumps
+        
+        if config.compress and config.compression_type in (CompressionType.ZLIB, CompressionType.GZIP):
+            compress = zlib.compress if config.compression_type == CompressionType.ZLIB else gzip.compress
+            threshold = config.compress_threshold_bytes
+            
+            def serialize(cache_data: Dict[str, Any]) -> tuple:
+                raw = dumps(cache_data).encode()
+                if len(raw) >= threshold:
+                    return compress(raw), True
+                return raw, False
+        else:
+            # PICKLE is never used for Redis payloads, unpickling shared data is unsafe
+            def serialize(cache_data: Dict[str, Any]) -> tuple:
+                return dumps(cache_data).encode(), False
+        
+        return serialize
+    
+    @staticmethod
+    def _deserialize(raw: bytes) -> Dict[str, Any]:
+        """Decode a Redis payload written by one of the level serializers"""
+        if raw[:2] == b"\x1f\x8b":
+            raw = gzip.decompress(raw)
+        elif raw[:1] == b"x":
+            raw = zlib.decompress(raw)
+        return json.loads(raw)
     
     def _get_config(self, cache_level: CacheLevel) -> CacheConfig:
         """Get configuration for cache level"""
@@ -338,32 +393,82 @@ class IntelligentCacheManager:
             if self.enabled and self.redis_client:
                 cached_data = await self.redis_client.get(cache_key)
                 if cached_data:
-                    self.cache_stats["hits"] += 1
-                    result = json.loads(cached_data)
+                    self.metrics.hits += 1
+                    result = self._deserialize(cached_data)
                     logger.debug(f"Cache HIT for {cache_key}")
                     return result
             
             # Try local cache
             if cache_key in self.local_cache:
-                cached_item = self.local_cache[cache_key]
+                entry = self.local_cache[cache_key]
                 # Check if expired
-                if datetime.fromisoformat(cached_item["expires_at"]) > datetime.utcnow():
-                    self.cache_stats["hits"] += 1
+                if not entry.is_expired():
+                    entry.update_access()
+                    self.metrics.hits += 1
                     logger.debug(f"Local cache HIT for {cache_key}")
-                    return cached_item["data"]
+                    return entry.data
                 else:
                     # Remove expired item
                     del self.local_cache[cache_key]
             
-            self.cache_stats["misses"] += 1
+            self.metrics.misses += 1
+            
+            # Another caller is already computing this key, share its result
+            inflight = self._inflight.get(cache_key)
+            if inflight is not None:
+                logger.debug(f"Cache MISS for {cache_key}, awaiting in-flight computation")
+                return await asyncio.shield(inflight)
+            
             logger.debug(f"Cache MISS for {cache_key}")
             return None
             
         except Exception as e:
             logger.error(f"Cache GET error for {cache_key}: {e}")
-            self.cache_stats["errors"] += 1
+            self.metrics.errors += 1
             return None
     
+    async def get_or_compute(
+        self,
+        cache_level: CacheLevel,
+        target: str,
+        compute_fn: Callable[[], Awaitable[Dict[str, Any]]],
+        additional_params: Optional[Dict] = None,
+        custom_ttl: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Get data from cache, computing and caching it once on a miss"""
+        cached = await self.get(cache_level, target, additional_params)
+        if cached is not None:
+            return cached
+        
+        cache_key = self._generate_cache_key(cache_level, target, additional_params)
+        # A None result means the computing caller was cancelled; take over if nobody else has
+        inflight = self._inflight.get(cache_key)
+        while inflight is not None:
+            data = await asyncio.shield(inflight)
+            if data is not None:
+                return data
+            inflight = self._inflight.get(cache_key)
+        
+        future = asyncio.get_running_loop().create_future()
+        # Avoid "exception was never retrieved" warnings when nobody else waited
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[cache_key] = future
+        
+        try:
+            data = await compute_fn()
+            await self.set(cache_level, target, data, additional_params, custom_ttl)
+            future.set_result(data)
+            return data
+        except asyncio.CancelledError:
+            # Waiters were not cancelled themselves, so they see a miss instead
+            future.set_result(None)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(cache_key, None)
+    
     async def set(
         self,
         cache_level: CacheLevel,
@@ -386,30 +491,93 @@ class IntelligentCacheManager:
                 "ttl": ttl
             }
             
-            json_data = json.dumps(cache_data)
+            payload, _ = self._serializers[cache_level](cache_data)
             
-            # Set in Redis
+            # Queue for Redis; fall back to a synchronous write when the queue is full
             if self.enabled and self.redis_client:
-                await self.redis_client.setex(cache_key, ttl, json_data)
-                logger.debug(f"Cached in Redis: {cache_key} (TTL: {ttl}s)")
+                self._ensure_writer()
+                try:
+                    self._write_queue.put_nowait((cache_key, payload, ttl))
+                except asyncio.QueueFull:
+                    await self.redis_client.setex(cache_key, ttl, payload)
+                    logger.debug(f"Cached in Redis: {cache_key} (TTL: {ttl}s)")
             
             # Set in local cache (with size limit)
             if len(self.local_cache) < 1000:  # Limit local cache size
-                expires_at = datetime.utcnow() + timedelta(seconds=ttl)
-                self.local_cache[cache_key] = {
-                    "data": data,
-                    "expires_at": expires_at.isoformat()
-                }
+                now = time.monotonic()
+                self.local_cache[cache_key] = CacheEntry(
+                    data=data,
+                    created_at=now,
+                    accessed_at=now,
+                    ttl_seconds=ttl,
+                    tags=set(config.tags),
+                    dependencies=set(config.dependencies),
+                    size_bytes=len(payload)
+                )
                 logger.debug(f"Cached locally: {cache_key}")
             
-            self.cache_stats["sets"] += 1
+            self.metrics.sets += 1
             return True
             
         except Exception as e:
             logger.error(f"Cache SET error for {cache_key}: {e}")
-            self.cache_stats["errors"] += 1
+            self.metrics.errors += 1
             return False
     
+    def _ensure_writer(self):
+        """Start the background writer if it is not running"""
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._writer_loop())
+    
+    async def _writer_loop(self):
+        """Drain queued writes and flush them to Redis in pipelined batches"""
+        queue = self._write_queue
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.write_flush_interval
+            
+            # Collect up to write_batch_size items or until the flush interval elapses
+            while len(batch) < self.write_batch_size:
+                try:
+                    batch.append(queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                await self._flush_writes(batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+    
+    async def _drain_writes(self):
+        """Wait until every queued write has reached Redis"""
+        if not self._write_queue.empty():
+            self._ensure_writer()
+        await self._write_queue.join()
+    
+    async def _flush_writes(self, batch: List[tuple]):
+        """Write a batch of (key, payload, ttl) tuples in a single pipeline"""
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for cache_key, payload, ttl in batch:
+                pipe.setex(cache_key, ttl, payload)
+            await pipe.execute()
+            logger.debug(f"Flushed {len(batch)} cache writes to Redis")
+        except Exception as e:
+            logger.error(f"Cache write flush failed for {len(batch)} keys: {e}")
+            self.metrics.errors += len(batch)
+    
     async def delete(
         self,
         cache_level: CacheLevel,
@@ -420,8 +588,9 @@ class IntelligentCacheManager:
         cache_key = self._generate_cache_key(cache_level, target, additional_params)
         
         try:
-            # Delete from Redis
+            # Delete from Redis, after queued writes so none of them restores the key
             if self.enabled and self.redis_client:
+                await self._drain_writes()
                 await self.redis_client.delete(cache_key)
             
             # Delete from local cache
@@ -440,8 +609,9 @@ class IntelligentCacheManager:
         cleared = 0
         
         try:
-            # Clear Redis entries
+            # Clear Redis entries, after queued writes so none of them restores a key
             if self.enabled and self.redis_client:
+                await self._drain_writes()
                 pattern = f"phantom:*{target}*"
                 keys = await self.redis_client.keys(pattern)
                 if keys:
@@ -466,15 +636,15 @@ class IntelligentCacheManager:
     
     async def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
-        stats = self.cache_stats.copy()
+        stats = asdict(self.metrics)
         stats["enabled"] = self.enabled
         stats["redis_available"] = REDIS_AVAILABLE and self.redis_client is not None
         stats["local_cache_size"] = len(self.local_cache)
         
         # Calculate hit rate
-        total_requests = stats["hits"] + stats["misses"]
+        total_requests = self.metrics.hits + self.metrics.misses
         stats["hit_rate"] = (
-            stats["hits"] / total_requests 
+            self.metrics.hits / total_requests 
             if total_requests > 0 else 0.0
         )
         
@@ -494,11 +664,11 @@ class IntelligentCacheManager:
     
     async def cleanup_expired(self) -> int:
         """Clean up expired entries from local cache"""
-        now = datetime.utcnow()
+        now = time.monotonic()
         expired_keys = []
         
-        for key, item in self.local_cache.items():
-            if datetime.fromisoformat(item["expires_at"]) <= now:
+        for key, entry in self.local_cache.items():
+            if entry.created_at + entry.ttl_seconds <= now:
                 expired_keys.append(key)
         
         for key in expired_keys:
@@ -511,10 +681,19 @@ class IntelligentCacheManager:
     
     async def close(self):
         """Close cache connections"""
+        if self._writer_task and not self._writer_task.done():
+            # Flush pending writes before shutting down the writer
+            await self._write_queue.join()
+            self._writer_task.cancel()
+            self._writer_task = None
+        
         if self.redis_client:
             await self.redis_client.close()
             logger.info("Cache manager closed")
 
 
+# Backwards-compatible name used by app.core.cache
+CacheManager = IntelligentCacheManager
+
 # Global cache manager instance
 cache_manager = CacheManager()
\ No newline at end of file
@@ -5,19 +5,25 @@ Advanced Database Connection Manager with Pooling and Monitoring
 import asyncio
 import time
 import threading
-from typing import Dict, Any, Optional, List, ContextManager, Callable, Union
+from array import array
+from collections import deque
+from itertools import islice
+from typing import Dict, Any, Optional, List, ContextManager, Callable, Union, AsyncIterator
 from datetime import datetime, timedelta
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from contextlib import contextmanager, asynccontextmanager
+from contextvars import ContextVar
 from enum import Enum
 import logging
+from functools import lru_cache
 
 from sqlalchemy import create_engine, event, text, MetaData
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import QueuePool, NullPool, StaticPool
-from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool, NullPool, StaticPool, AsyncAdaptedQueuePool
+from sqlalchemy.engine import Engine, Connection
 from sqlalchemy.exc import SQLAlchemyError, DisconnectionError
-from sqlalchemy.engine.events import PoolEvents
 from sqlalchemy import __version__ as sqlalchemy_version
 
 from ..logging.structured_logger import get_logger, EventType
@@ -26,6 +32,44 @@ from ..error_handling.exceptions import DatabaseException, DatabaseConnectionExc
 
 logger = get_logger(__name__)
 
+class _LazyTruncate:
+    """Truncates a string only when it is actually formatted"""
+    
+    __slots__ = ('value', 'limit')
+    
+    def __init__(self, value: str, limit: int):
+        self.value = value
+        self.limit = limit
+    
+    def __str__(self) -> str:
+        if len(self.value) > self.limit:
+            return self.value[:self.limit] + "..."
+        return self.value
+
+
+def _zero() -> int:
+    """Fallback for pool statistics a pool class does not provide"""
+    return 0
+
+
+# Queries slower than this are counted in slow_query_count
+SLOW_QUERY_MS = 1000.0
+
+# Async driver for each sync backend
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+# Health check probe, built once instead of per tick
+_PROBE_STMT = text("SELECT 1 as test")
+
+
+@lru_cache(maxsize=256)
+def _compile(sql: str):
+    """Build (and reuse) the TextClause for a raw SQL string"""
+    return text(sql)
+
 
 class PoolType(Enum):
     """Database connection pool types"""
@@ -35,7 +79,7 @@ class PoolType(Enum):
     ASYNC_QUEUE_POOL = "async_queue"
 
 
-@dataclass
+@dataclass(slots=True)
 class ConnectionPoolConfig:
     """Configuration for database connection pool"""
     # Pool settings
@@ -44,6 +88,8 @@ class ConnectionPoolConfig:
     pool_timeout: int = 30
     pool_recycle: int = 3600  # 1 hour
     pool_pre_ping: bool = True
+    pool_use_lifo: bool = True  # reuse the most recently returned connection
+    query_cache_size: int = 1200  # compiled statement cache entries (SQLAlchemy default 500)
     
     # Connection settings
     connect_timeout: int = 10
@@ -65,7 +111,7 @@ class ConnectionPoolConfig:
     retry_delay: float = 1.0
 
 
-@dataclass
+@dataclass(slots=True)
 class ConnectionMetrics:
     """Connection pool metrics"""
     pool_size: int = 0
@@ -87,7 +133,8 @@ class ConnectionMetrics:
     
     # Time-based metrics
     uptime_seconds: float = 0.0
-    last_activity: Optional[datetime] = None
+    # Monotonic stamp of the last connect/checkout; plain int write from listeners, no lock needed
+    last_activity_ns: int = 0
     last_health_check: Optional[datetime] = None
     
     # Error tracking
@@ -95,8 +142,16 @@ class ConnectionMetrics:
     timeout_errors: int = 0
     query_errors: int = 0
     
+    @property
+    def last_activity(self) -> Optional[datetime]:
+        """Wall-clock time of the last connection activity"""
+        if not self.last_activity_ns:
+            return None
+        return datetime.utcnow() - timedelta(seconds=(time.monotonic_ns() - self.last_activity_ns) / 1e9)
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
+        last_activity = self.last_activity
         return {
             "pool_status": {
                 "pool_size": self.pool_size,
@@ -122,9 +177,7 @@ class ConnectionMetrics:
             },
             "status": {
                 "uptime_seconds": round(self.uptime_seconds, 2),
-                "last_activity": (
-                    self.last_activity.isoformat() if self.last_activity else None
-                ),
+                "last_activity": last_activity.isoformat() if last_activity else None,
                 "last_health_check": (
                     self.last_health_check.isoformat() if self.last_health_check else None
                 )
@@ -151,28 +204,77 @@ class DatabaseConnectionManager:
     - Structured logging
     """
     
+    __slots__ = (
+        'database_url', 'config', 'metrics', 'start_time', '_start_mono',
+        'lock', 'metrics_lock', '_checkout_lock', '_query_lock', '_health_lock',
+        'engine', 'session_factory', 'async_engine', 'async_session_factory',
+        '_current_session', '_current_async_session',
+        '_health_engine', '_health_conn',
+        'monitoring_active', 'monitoring_task', 'health_check_task', 'sample_flush_task',
+        'query_times', 'checkout_times', '_query_sum', '_checkout_sum',
+        '_tls', '_tls_buffers', '_tls_registry_lock', 'sample_flush_threshold', 'sample_flush_interval',
+        '_metrics_version', '_metrics_cache', '_metrics_cache_version', '_metrics_cache_ts', 'metrics_cache_ttl',
+        '_pool_size_fn', '_pool_checkedout_fn', '_pool_overflow_fn', '_pool_invalid_fn',
+    )
+    
     def __init__(self, database_url: str, config: Optional[ConnectionPoolConfig] = None):
         self.database_url = database_url
         self.config = config or ConnectionPoolConfig()
         self.metrics = ConnectionMetrics()
-        self.start_time = time.time()
+        self.start_time = time.time()  # wall clock, for display only
+        self._start_mono = time.monotonic()
         
-        # Threading locks
+        # Threading locks. Counters are plain int increments (no GIL switch between
+        # load and store on CPython 3.10+), so only the timing windows need locks.
         self.lock = threading.RLock()
         self.metrics_lock = threading.Lock()
+        self._checkout_lock = threading.Lock()
+        self._query_lock = threading.Lock()
+        self._health_lock = threading.Lock()
         
         # Connection objects
         self.engine: Optional[Engine] = None
         self.session_factory: Optional[sessionmaker] = None
+        # Session of the current context, so nested get_session calls share it
+        self._current_session: ContextVar[Optional[Session]] = ContextVar(
+            f"session_{id(self)}", default=None
+        )
+        # Health probes use their own unpooled connection so they never compete with traffic
+        self._health_engine: Optional[Engine] = None
+        self._health_conn: Optional[Connection] = None
+        self.async_engine: Optional[AsyncEngine] = None
+        self.async_session_factory: Optional[async_sessionmaker] = None
+        # Async session of the current task, so nested get_async_session calls share it
+        self._current_async_session: ContextVar[Optional[AsyncSession]] = ContextVar(
+            f"async_session_{id(self)}", default=None
+        )
         
         # Monitoring
         self.monitoring_active = False
         self.monitoring_task: Optional[asyncio.Task] = None
         self.health_check_task: Optional[asyncio.Task] = None
         
-        # Query tracking
-        self.query_times: List[float] = []
-        self.checkout_times: List[float] = []
+        # Query tracking (sliding windows with running sums)
+        self.query_times: deque = deque(maxlen=1000)
+        self.checkout_times: deque = deque(maxlen=1000)
+        self._query_sum = 0.0
+        self._checkout_sum = 0.0
+        
+        # Per-thread query sample buffers, appended without locking and folded
+        # into query_times by the monitor task, get_metrics() or when full
+        self._tls = threading.local()
+        self._tls_buffers: Dict[int, array] = {}  # thread ident -> buffer
+        self._tls_registry_lock = threading.Lock()
+        self.sample_flush_threshold = 256
+        self.sample_flush_interval = 1.0  # seconds
+        self.sample_flush_task: Optional[asyncio.Task] = None
+        
+        # Memoized get_metrics() result, invalidated by _metrics_version
+        self._metrics_version = 0
+        self._metrics_cache: Optional[Dict[str, Any]] = None
+        self._metrics_cache_version = -1
+        self._metrics_cache_ts = 0.0
+        self.metrics_cache_ttl = 0.5  # seconds
         
         # Initialize
         self._initialize_engine()
@@ -199,6 +301,7 @@ class DatabaseConnectionManager:
                 'poolclass': pool_class,
                 'echo': False,  # Set to True for SQL debugging
                 'future': True,
+                'query_cache_size': self.config.query_cache_size,
             }
             
             # Pool-specific arguments
@@ -209,6 +312,7 @@ class DatabaseConnectionManager:
                     'pool_timeout': self.config.pool_timeout,
                     'pool_recycle': self.config.pool_recycle,
                     'pool_pre_ping': self.config.pool_pre_ping,
+                    'pool_use_lifo': self.config.pool_use_lifo,
                 })
             
             # Connection arguments
@@ -220,6 +324,13 @@ class DatabaseConnectionManager:
             
             # Create engine
             self.engine = create_engine(**engine_args)
+            self._bind_pool_stats()
+            self._health_engine = create_engine(
+                self.database_url,
+                poolclass=NullPool,
+                isolation_level="AUTOCOMMIT",
+                connect_args=connect_args
+            )
             
             # Create session factory
             self.session_factory = sessionmaker(
@@ -229,6 +340,8 @@ class DatabaseConnectionManager:
                 expire_on_commit=False
             )
             
+            self._initialize_async_engine()
+            
             logger.info(
                 "Database connection manager initialized",
                 event_type=EventType.SYSTEM_EVENT,
@@ -236,6 +349,7 @@ class DatabaseConnectionManager:
                     "pool_type": self.config.pool_type.value,
                     "pool_size": self.config.pool_size,
                     "max_overflow": self.config.max_overflow,
+                    "async_enabled": self.async_engine is not None,
                     "sqlalchemy_version": sqlalchemy_version
                 }
             )
@@ -248,120 +362,261 @@ class DatabaseConnectionManager:
             )
             raise DatabaseConnectionException(f"Failed to initialize database: {str(e)}")
     
+    def _bind_pool_stats(self):
+        """Resolve pool statistic methods once so metric reads are direct calls"""
+        pool = self.engine.pool
+        self._pool_size_fn = getattr(pool, 'size', None) or _zero
+        self._pool_checkedout_fn = getattr(pool, 'checkedout', None) or _zero
+        self._pool_overflow_fn = getattr(pool, 'overflow', None) or _zero
+        self._pool_invalid_fn = getattr(pool, 'invalid', None) or _zero
+    
+    def _initialize_async_engine(self):
+        """Initialize the native async engine used by get_async_session"""
+        url = make_url(self.database_url)
+        async_driver = ASYNC_DRIVERS.get(url.get_backend_name())
+        
+        if not async_driver:
+            logger.warning(
+                "No async driver for database backend, async sessions disabled",
+                event_type=EventType.SYSTEM_EVENT,
+                metadata={"backend": url.get_backend_name()}
+            )
+            return
+        
+        engine_args: Dict[str, Any] = {'echo': False, 'query_cache_size': self.config.query_cache_size}
+        
+        if self.config.pool_type in [PoolType.QUEUE_POOL, PoolType.ASYNC_QUEUE_POOL]:
+            engine_args.update({
+                # Explicit, since some async dialects (aiosqlite) default to NullPool
+                'poolclass': AsyncAdaptedQueuePool,
+                'pool_size': self.config.pool_size,
+                'max_overflow': self.config.max_overflow,
+                'pool_timeout': self.config.pool_timeout,
+                'pool_recycle': self.config.pool_recycle,
+                'pool_pre_ping': self.config.pool_pre_ping,
+                'pool_use_lifo': self.config.pool_use_lifo,
+            })
+        else:
+            engine_args['poolclass'] = NullPool
+        
+        if url.get_backend_name() == "postgresql":
+            # asyncpg names its timeouts differently from libpq
+            engine_args['connect_args'] = {
+                'timeout': self.config.connect_timeout,
+                'command_timeout': self.config.command_timeout,
+            }
+        
+        try:
+            self.async_engine = create_async_engine(url.set(drivername=async_driver), **engine_args)
+        except ImportError as e:
+            logger.warning(
+                "Async database driver not installed, async sessions disabled",
+                event_type=EventType.SYSTEM_EVENT,
+                metadata={"driver": async_driver, "error": str(e)}
+            )
+            return
+        
+        self.async_session_factory = async_sessionmaker(
+            bind=self.async_engine,
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False
+        )
+    
     def _setup_event_listeners(self):
         """Setup SQLAlchemy event listeners for monitoring"""
         if not self.engine:
             return
         
+        self._register_event_listeners(self.engine)
+        if self.async_engine:
+            # Async engines emit pool and cursor events through their sync engine
+            self._register_event_listeners(self.async_engine.sync_engine)
+    
+    def _register_event_listeners(self, engine: Engine):
+        """Register monitoring listeners on a single engine"""
         # Connection events
-        @event.listens_for(self.engine, "connect")
+        @event.listens_for(engine, "connect")
         def on_connect(dbapi_connection, connection_record):
-            with self.metrics_lock:
-                self.metrics.total_connections_created += 1
-                self.metrics.last_activity = datetime.utcnow()
+            self._metrics_version += 1
+            self.metrics.total_connections_created += 1
+            self.metrics.last_activity_ns = time.monotonic_ns()
             
-            logger.debug(
-                "Database connection created",
-                event_type=EventType.DATABASE_QUERY,
-                metadata={"connection_id": id(dbapi_connection)}
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Database connection created",
+                    event_type=EventType.DATABASE_QUERY,
+                    metadata={"connection_id": id(dbapi_connection)}
+                )
         
-        @event.listens_for(self.engine, "close")
+        @event.listens_for(engine, "close")
         def on_close(dbapi_connection, connection_record):
-            with self.metrics_lock:
-                self.metrics.total_connections_closed += 1
+            self._metrics_version += 1
+            self.metrics.total_connections_closed += 1
             
-            logger.debug(
-                "Database connection closed",
-                event_type=EventType.DATABASE_QUERY,
-                metadata={"connection_id": id(dbapi_connection)}
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Database connection closed",
+                    event_type=EventType.DATABASE_QUERY,
+                    metadata={"connection_id": id(dbapi_connection)}
+                )
         
         # Pool events
-        @event.listens_for(self.engine, "checkout")
+        @event.listens_for(engine, "checkout")
         def on_checkout(dbapi_connection, connection_record, connection_proxy):
-            connection_record._checkout_time = time.time()
-            with self.metrics_lock:
-                self.metrics.total_checkouts += 1
-                self.metrics.last_activity = datetime.utcnow()
+            connection_record._checkout_t0 = time.monotonic_ns()
+            self._metrics_version += 1
+            self.metrics.total_checkouts += 1
+            self.metrics.last_activity_ns = time.monotonic_ns()
         
-        @event.listens_for(self.engine, "checkin")
+        @event.listens_for(engine, "checkin")
         def on_checkin(dbapi_connection, connection_record):
-            if hasattr(connection_record, '_checkout_time'):
-                checkout_time = (time.time() - connection_record._checkout_time) * 1000
+            if hasattr(connection_record, '_checkout_t0'):
+                checkout_time = (time.monotonic_ns() - connection_record._checkout_t0) / 1_000_000
                 self._update_checkout_time(checkout_time)
-                delattr(connection_record, '_checkout_time')
+                delattr(connection_record, '_checkout_t0')
+            
+            self._metrics_version += 1
+            self.metrics.total_checkins += 1
+        
+        # "connect" only fires on success; failed connects and disconnects surface here
+        @event.listens_for(engine, "handle_error")
+        def on_handle_error(exception_context):
+            # Statement errors are counted by get_session; pre-ping failures are recovered transparently
+            if exception_context.is_pre_ping:
+                return
+            if exception_context.connection is not None and not exception_context.is_disconnect:
+                return
             
-            with self.metrics_lock:
-                self.metrics.total_checkins += 1
-        
-        @event.listens_for(self.engine, "connect")
-        def on_connect_error(dbapi_connection, connection_record, exception):
-            with self.metrics_lock:
-                self.metrics.connection_errors += 1
-                self.metrics.total_failures += 1
+            self._metrics_version += 1
+            self.metrics.connection_errors += 1
+            self.metrics.total_failures += 1
             
             logger.error(
                 "Database connection error",
-                error=exception,
+                error=exception_context.original_exception,
                 event_type=EventType.ERROR_OCCURRED
             )
         
         # Before/After cursor execute for query timing
-        @event.listens_for(self.engine, "before_cursor_execute")
+        @event.listens_for(engine, "before_cursor_execute")
         def on_before_execute(conn, cursor, statement, parameters, context, executemany):
-            context._query_start_time = time.time()
+            context._query_t0 = time.monotonic_ns()
         
-        @event.listens_for(self.engine, "after_cursor_execute")
+        @event.listens_for(engine, "after_cursor_execute")
         def on_after_execute(conn, cursor, statement, parameters, context, executemany):
-            if hasattr(context, '_query_start_time'):
-                query_time = (time.time() - context._query_start_time) * 1000
-                self._update_query_time(query_time)
+            if hasattr(context, '_query_t0'):
+                query_time = (time.monotonic_ns() - context._query_t0) / 1_000_000
+                self._record_query_sample(query_time)
     
     def _update_checkout_time(self, checkout_time_ms: float):
         """Update checkout time metrics"""
-        with self.metrics_lock:
+        with self._checkout_lock:
+            self._metrics_version += 1
+            # Drop the oldest sample from the running sum before the deque evicts it
+            if len(self.checkout_times) == self.checkout_times.maxlen:
+                self._checkout_sum -= self.checkout_times[0]
             self.checkout_times.append(checkout_time_ms)
-            # Keep only recent times (last 1000)
-            self.checkout_times = self.checkout_times[-1000:]
+            self._checkout_sum += checkout_time_ms
             
-            if self.checkout_times:
-                self.metrics.average_checkout_time_ms = sum(self.checkout_times) / len(self.checkout_times)
+            self.metrics.average_checkout_time_ms = self._checkout_sum / len(self.checkout_times)
     
     def _update_query_time(self, query_time_ms: float):
         """Update query time metrics"""
-        with self.metrics_lock:
-            self.query_times.append(query_time_ms)
-            # Keep only recent times (last 1000)
-            self.query_times = self.query_times[-1000:]
-            
-            if self.query_times:
-                self.metrics.average_query_time_ms = sum(self.query_times) / len(self.query_times)
-            
-            # Count slow queries (> 1 second)
-            if query_time_ms > 1000:
-                self.metrics.slow_query_count += 1
+        with self._query_lock:
+            self._fold_query_samples((query_time_ms,))
+    
+    def _fold_query_samples(self, samples):
+        """Fold a batch of query times into the sliding window (caller holds _query_lock)"""
+        # Count slow queries (> 1 second); map/sum keep the per-sample loop in C
+        self.metrics.slow_query_count += sum(map(SLOW_QUERY_MS.__lt__, samples))
+        
+        window = self.query_times
+        if len(samples) > window.maxlen:
+            samples = samples[-window.maxlen:]
+        
+        # Drop the samples the deque is about to evict from the running sum
+        evicted = len(window) + len(samples) - window.maxlen
+        if evicted > 0:
+            self._query_sum -= sum(islice(window, evicted))
+        window.extend(samples)
+        self._query_sum += sum(samples)
+        
+        self._metrics_version += 1
+        self.metrics.average_query_time_ms = self._query_sum / len(window)
+    
+    def _record_query_sample(self, query_time_ms: float):
+        """Buffer a query time in this thread's sample buffer"""
+        buf = getattr(self._tls, 'query_samples', None)
+        if buf is None:
+            buf = self._tls.query_samples = array('d')
+            with self._tls_registry_lock:
+                # A reused thread ident may still hold an exited thread's samples
+                stale = self._tls_buffers.get(threading.get_ident())
+                self._tls_buffers[threading.get_ident()] = buf
+            if stale:
+                self._drain_sample_buffer(stale)
+        
+        buf.append(query_time_ms)
+        if len(buf) >= self.sample_flush_threshold:
+            self._drain_sample_buffer(buf)
+    
+    def _drain_sample_buffer(self, buf: array):
+        """Move buffered samples into the query window"""
+        with self._query_lock:
+            count = len(buf)
+            if not count:
+                return
+            # Only the owning thread appends, and only at the end, so deleting
+            # the first `count` items never drops a sample added meanwhile
+            samples = buf[:count]
+            del buf[:count]
+            self._fold_query_samples(samples)
+    
+    def _drain_query_samples(self):
+        """Drain every thread's query sample buffer"""
+        with self._tls_registry_lock:
+            buffers = list(self._tls_buffers.items())
+        
+        live_threads = {thread.ident for thread in threading.enumerate()}
+        for ident, buf in buffers:
+            if buf:
+                self._drain_sample_buffer(buf)
+            if ident not in live_threads:
+                with self._tls_registry_lock:
+                    if self._tls_buffers.get(ident) is buf:
+                        del self._tls_buffers[ident]
     
     @contextmanager
-    def get_session(self) -> ContextManager[Session]:
+    def get_session(self, readonly: bool = False) -> ContextManager[Session]:
         """Get database session with automatic cleanup"""
         if not self.session_factory:
             raise DatabaseConnectionException("Database not initialized")
         
+        current = self._current_session.get()
+        if current is not None:
+            # Nested call in the same context: the outer unit of work owns commit/rollback/close
+            yield current
+            return
+        
         session = None
         start_time = time.time()
         
         try:
             session = self.session_factory()
+            # Restored with set() rather than reset(token): FastAPI runs a sync dependency's
+            # enter and exit in separate threadpool calls, each in its own copied context
+            self._current_session.set(session)
             yield session
-            session.commit()
+            if not readonly:
+                session.commit()
             
         except Exception as e:
             if session:
                 session.rollback()
             
-            with self.metrics_lock:
-                self.metrics.query_errors += 1
+            self._metrics_version += 1
+            self.metrics.query_errors += 1
             
             logger.error(
                 "Database session error",
@@ -373,45 +628,72 @@ class DatabaseConnectionManager:
             
         finally:
             if session:
+                self._current_session.set(None)
                 session.close()
     
     @asynccontextmanager
-    async def get_async_session(self):
-        """Get async database session (placeholder for future async implementation)"""
-        # For now, run sync session in thread pool
-        def get_sync_session():
-            return self.get_session()
+    async def get_async_session(self) -> AsyncIterator[AsyncSession]:
+        """Get native async database session with automatic cleanup"""
+        if not self.async_session_factory:
+            raise DatabaseConnectionException("Async database not initialized")
         
-        loop = asyncio.get_event_loop()
-        session_context = await loop.run_in_executor(None, get_sync_session)
+        current = self._current_async_session.get()
+        if current is not None:
+            # Nested call in the same task: the outer unit of work owns commit/rollback
+            yield current
+            return
         
-        try:
-            yield session_context
-        finally:
-            pass
+        start_time = time.time()
+        
+        async with self.async_session_factory() as session:
+            token = self._current_async_session.set(session)
+            try:
+                yield session
+                await session.commit()
+                
+            except Exception as e:
+                await session.rollback()
+                
+                self._metrics_version += 1
+                self.metrics.query_errors += 1
+                
+                logger.error(
+                    "Async database session error",
+                    error=e,
+                    event_type=EventType.ERROR_OCCURRED,
+                    performance_metrics={"session_duration_ms": (time.time() - start_time) * 1000}
+                )
+                raise DatabaseException(f"Database session error: {str(e)}")
+            
+            finally:
+                self._current_async_session.reset(token)
     
-    def execute_query(self, query: str, params: Optional[Dict] = None) -> Any:
-        """Execute raw SQL query"""
-        with self.get_session() as session:
+    def execute_query(self, query: str, params: Optional[Dict] = None, readonly: bool = False) -> Any:
+        """Execute raw SQL query, skipping the COMMIT round-trip when readonly"""
+        # Inside an outer get_session the caller's unit of work owns commit/rollback
+        owns_session = self._current_session.get() is None
+        
+        with self.get_session(readonly=readonly) as session:
             start_time = time.time()
             
             try:
-                result = session.execute(text(query), params or {})
-                session.commit()
-                
-                query_time = (time.time() - start_time) * 1000
+                result = session.execute(_compile(query), params or {})
+                if owns_session and not readonly:
+                    session.commit()
                 
-                logger.debug(
-                    "Query executed successfully",
-                    event_type=EventType.DATABASE_QUERY,
-                    performance_metrics={"query_time_ms": query_time},
-                    metadata={"query_length": len(query)}
-                )
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        "Query executed successfully",
+                        event_type=EventType.DATABASE_QUERY,
+                        performance_metrics={"query_time_ms": (time.time() - start_time) * 1000},
+                        metadata={"query_length": len(query)}
+                    )
                 
                 return result
                 
             except Exception as e:
-                session.rollback()
+                if owns_session:
+                    session.rollback()
                 query_time = (time.time() - start_time) * 1000
                 
                 logger.error(
@@ -419,23 +701,25 @@ class DatabaseConnectionManager:
                     error=e,
                     event_type=EventType.ERROR_OCCURRED,
                     performance_metrics={"query_time_ms": query_time},
-                    metadata={"query": query[:200] + "..." if len(query) > 200 else query}
+                    metadata={"query": _LazyTruncate(query, 200)}
                 )
                 raise
     
     async def health_check(self) -> Dict[str, Any]:
-        """Perform comprehensive health check"""
+        """Perform comprehensive health check without blocking the event loop"""
+        return await asyncio.to_thread(self.check_health)
+    
+    def check_health(self) -> Dict[str, Any]:
+        """Perform comprehensive health check from synchronous code"""
         start_time = time.time()
         health_status = {"healthy": True, "details": {}}
         
         try:
             # Test basic connectivity
-            with self.get_session() as session:
-                result = session.execute(text("SELECT 1 as test"))
-                row = result.fetchone()
-                
-                if not row or row[0] != 1:
-                    raise DatabaseException("Health check query failed")
+            row = self._run_probe_query()
+            
+            if not row or row[0] != 1:
+                raise DatabaseException("Health check query failed")
             
             # Check pool status
             pool_status = self._get_pool_status()
@@ -447,25 +731,26 @@ class DatabaseConnectionManager:
                 health_status["details"]["warning"] = "Connection pool utilization > 90%"
             
             # Update metrics
-            with self.metrics_lock:
-                self.metrics.last_health_check = datetime.utcnow()
+            self._metrics_version += 1
+            self.metrics.last_health_check = datetime.utcnow()
             
             response_time = (time.time() - start_time) * 1000
             health_status["details"]["response_time_ms"] = response_time
             
-            logger.debug(
-                "Database health check completed",
-                event_type=EventType.SYSTEM_EVENT,
-                performance_metrics={"health_check_time_ms": response_time},
-                metadata={"pool_utilization": pool_status.get("utilization_percent", 0)}
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Database health check completed",
+                    event_type=EventType.SYSTEM_EVENT,
+                    performance_metrics={"health_check_time_ms": response_time},
+                    metadata={"pool_utilization": pool_status.get("utilization_percent", 0)}
+                )
             
         except Exception as e:
             health_status["healthy"] = False
             health_status["details"]["error"] = str(e)
             
-            with self.metrics_lock:
-                self.metrics.connection_errors += 1
+            self._metrics_version += 1
+            self.metrics.connection_errors += 1
             
             logger.error(
                 "Database health check failed",
@@ -475,18 +760,45 @@ class DatabaseConnectionManager:
         
         return health_status
     
+    def _run_probe_query(self):
+        """Run the health check probe query on the reserved health connection"""
+        with self._health_lock:
+            try:
+                return self._probe_health_conn()
+            except SQLAlchemyError:
+                # Connection may have gone stale (e.g. database restart), retry once on a fresh one
+                self._discard_health_conn()
+                try:
+                    return self._probe_health_conn()
+                except SQLAlchemyError:
+                    self._discard_health_conn()
+                    raise
+    
+    def _probe_health_conn(self):
+        """Execute the probe, opening the health connection if needed"""
+        if self._health_conn is None:
+            self._health_conn = self._health_engine.connect()
+        return self._health_conn.execute(_PROBE_STMT).fetchone()
+    
+    def _discard_health_conn(self):
+        """Close the health connection, ignoring errors from a broken connection"""
+        conn, self._health_conn = self._health_conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except SQLAlchemyError:
+                pass
+    
     def _get_pool_status(self) -> Dict[str, Any]:
         """Get current connection pool status"""
-        if not self.engine or not hasattr(self.engine, 'pool'):
+        if not self.engine:
             return {}
         
-        pool = self.engine.pool
-        
         status = {
-            "pool_size": getattr(pool, 'size', lambda: 0)(),
-            "checked_out": getattr(pool, 'checkedout', lambda: 0)(),
-            "overflow": getattr(pool, 'overflow', lambda: 0)(),
-            "invalid": getattr(pool, 'invalid', lambda: 0)(),
+            "pool_size": self._pool_size_fn(),
+            "checked_out": self._pool_checkedout_fn(),
+            "overflow": self._pool_overflow_fn(),
+            "invalid": self._pool_invalid_fn(),
         }
         
         # Calculate utilization percentage
@@ -499,53 +811,57 @@ class DatabaseConnectionManager:
         return status
     
     def get_metrics(self) -> Dict[str, Any]:
-        """Get comprehensive connection manager metrics"""
+        """Get comprehensive connection manager metrics
+        
+        The result is memoized until metrics change or metrics_cache_ttl elapses,
+        so callers must treat it as read-only.
+        """
+        self._drain_query_samples()
+        
+        now = time.monotonic()
+        if (
+            self._metrics_cache is not None
+            and self._metrics_cache_version == self._metrics_version
+            and now - self._metrics_cache_ts < self.metrics_cache_ttl
+        ):
+            return self._metrics_cache
+        
+        # Snapshot under the lock, build the dict outside it
         with self.metrics_lock:
-            # Update runtime metrics
-            self.metrics.uptime_seconds = time.time() - self.start_time
-            self.metrics.pool_size = getattr(self.engine.pool, 'size', lambda: 0)() if self.engine else 0
-            self.metrics.checked_out = getattr(self.engine.pool, 'checkedout', lambda: 0)() if self.engine else 0
-            self.metrics.overflow = getattr(self.engine.pool, 'overflow', lambda: 0)() if self.engine else 0
-            
-            # Create metrics copy
-            return self.metrics.to_dict()
+            snapshot = replace(self.metrics)
+            version = self._metrics_version
+        
+        # Update runtime metrics
+        snapshot.uptime_seconds = now - self._start_mono
+        if self.engine:
+            snapshot.pool_size = self._pool_size_fn()
+            snapshot.checked_out = self._pool_checkedout_fn()
+            snapshot.overflow = self._pool_overflow_fn()
+        
+        metrics = snapshot.to_dict()
+        self._metrics_cache = metrics
+        self._metrics_cache_version = version
+        self._metrics_cache_ts = now
+        return metrics
     
     def _start_monitoring(self):
-        """Start monitoring tasks"""
+        """Start monitoring tasks on the running event loop"""
         self.monitoring_active = True
         
-        # Start periodic metrics logging
-        def log_metrics():
-            if self.monitoring_active:
-                metrics = self.get_metrics()
-                logger.info(
-                    "Database connection metrics",
-                    event_type=EventType.PERFORMANCE_METRIC,
-                    metadata=metrics
-                )
-                
-                # Schedule next log
-                threading.Timer(self.config.stats_interval, log_metrics).start()
-        
-        # Start health checks
-        def periodic_health_check():
-            if self.monitoring_active:
-                try:
-                    # Run health check in thread pool to avoid blocking
-                    asyncio.run(self.health_check())
-                except Exception as e:
-                    logger.error(
-                        "Periodic health check failed",
-                        error=e,
-                        event_type=EventType.ERROR_OCCURRED
-                    )
-                
-                # Schedule next health check
-                threading.Timer(self.config.health_check_interval, periodic_health_check).start()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Created outside an event loop (e.g. at import time); start_monitoring()
+            # schedules the tasks once the application loop is running
+            logger.info(
+                "Database monitoring deferred until an event loop is running",
+                event_type=EventType.SYSTEM_EVENT
+            )
+            return
         
-        # Start both monitoring tasks
-        threading.Timer(self.config.stats_interval, log_metrics).start()
-        threading.Timer(self.config.health_check_interval, periodic_health_check).start()
+        self.monitoring_task = loop.create_task(self._metrics_loop())
+        self.health_check_task = loop.create_task(self._health_loop())
+        self.sample_flush_task = loop.create_task(self._sample_flush_loop())
         
         logger.info(
             "Database monitoring started",
@@ -556,18 +872,71 @@ class DatabaseConnectionManager:
             }
         )
     
+    def start_monitoring(self):
+        """Start monitoring tasks if enabled and not already running"""
+        if not self.config.enable_monitoring:
+            return
+        if self.monitoring_task and not self.monitoring_task.done():
+            return
+        self._start_monitoring()
+    
+    async def _metrics_loop(self):
+        """Periodically log connection metrics"""
+        while self.monitoring_active:
+            await asyncio.sleep(self.config.stats_interval)
+            metrics = self.get_metrics()
+            logger.info(
+                "Database connection metrics",
+                event_type=EventType.PERFORMANCE_METRIC,
+                metadata=metrics
+            )
+    
+    async def _sample_flush_loop(self):
+        """Periodically fold thread-local query samples into the metrics"""
+        while self.monitoring_active:
+            await asyncio.sleep(self.sample_flush_interval)
+            self._drain_query_samples()
+    
+    async def _health_loop(self):
+        """Periodically run health checks"""
+        while self.monitoring_active:
+            await asyncio.sleep(self.config.health_check_interval)
+            try:
+                await self.health_check()
+            except Exception as e:
+                logger.error(
+                    "Periodic health check failed",
+                    error=e,
+                    event_type=EventType.ERROR_OCCURRED
+                )
+    
     def stop_monitoring(self):
         """Stop monitoring tasks"""
         self.monitoring_active = False
+        
+        for task in (self.monitoring_task, self.health_check_task, self.sample_flush_task):
+            if task and not task.done():
+                task.cancel()
+        self.monitoring_task = None
+        self.health_check_task = None
+        self.sample_flush_task = None
+        
         logger.info("Database monitoring stopped", event_type=EventType.SYSTEM_EVENT)
     
     def reset_metrics(self):
         """Reset connection metrics"""
-        with self.metrics_lock:
+        with self.metrics_lock, self._checkout_lock, self._query_lock:
+            self._metrics_version += 1
             self.metrics = ConnectionMetrics()
             self.query_times.clear()
             self.checkout_times.clear()
+            with self._tls_registry_lock:
+                for buf in self._tls_buffers.values():
+                    del buf[:]
+            self._query_sum = 0.0
+            self._checkout_sum = 0.0
             self.start_time = time.time()
+            self._start_mono = time.monotonic()
         
         logger.info("Database metrics reset", event_type=EventType.SYSTEM_EVENT)
     
@@ -575,14 +944,32 @@ class DatabaseConnectionManager:
         """Close database connection manager"""
         self.stop_monitoring()
         
+        if self._health_engine:
+            with self._health_lock:
+                self._discard_health_conn()
+            self._health_engine.dispose()
+        
+        if self.async_engine:
+            # Async connections can only be closed from a running loop (see close_async)
+            self.async_engine.sync_engine.dispose(close=False)
+        
         if self.engine:
             self.engine.dispose()
+            # dispose() replaces the pool, rebind its statistics
+            self._bind_pool_stats()
             logger.info(
                 "Database connection manager closed",
                 event_type=EventType.SYSTEM_EVENT,
                 metadata=self.get_metrics()
             )
     
+    async def close_async(self):
+        """Close database connection manager, closing async connections cleanly"""
+        if self.async_engine:
+            await self.async_engine.dispose()
+            self.async_engine = None
+        self.close()
+    
     def __enter__(self):
         return self
     
@@ -3,17 +3,21 @@ Standardized Error Handler with Retry Logic and Context Management
 """
 
 import asyncio
+import errno
+import re
 import time
+from time import perf_counter
 import random
-from typing import Callable, Any, Optional, Dict, List, Union, Type
-from functools import wraps
-from dataclasses import dataclass
+from typing import Callable, Any, Optional, Dict, List, Union, Type, Sequence, Tuple
+from functools import wraps, partial
+from dataclasses import dataclass, field
+from collections import Counter
 from enum import Enum
 import traceback
 import logging
 
 from .exceptions import (
-    PhantomBaseException, ErrorContext, ErrorCategory, ErrorSeverity,
+    PhantomBaseException, ErrorContext, EMPTY_ERROR_CONTEXT, ErrorCategory, ErrorSeverity,
     TimeoutException, NetworkException, ExternalServiceException,
     RateLimitException, CircuitBreakerException,
     is_retryable_error, get_retry_delay, wrap_external_exception
@@ -23,6 +27,63 @@ from ..logging.structured_logger import get_logger, EventType
 
 logger = get_logger(__name__)
 
+# Exception classification: one alternation tags every keyword category in a
+# single pass over the message; the lowest priority value found wins
+_MESSAGE_KIND_PATTERN = re.compile(
+    r"(?P<timeout>timeout)"
+    r"|(?P<network>connection|network|unreachable|refused)"
+    r"|(?P<authz>forbidden|authorization)"
+    r"|(?P<auth>auth|unauthorized|credentials)"
+    r"|(?P<rate_limit>rate limit|too many requests|quota exceeded)"
+    r"|(?P<permission>permission)"
+    r"|(?P<not_found>not found)"
+)
+_TYPE_KINDS = (
+    ((asyncio.TimeoutError, TimeoutError), "timeout"),
+    (ConnectionError, "network"),
+    (PermissionError, "permission"),
+    (FileNotFoundError, "not_found"),
+)
+_NETWORK_ERRNOS = frozenset({
+    errno.ECONNREFUSED,
+    errno.ECONNRESET,
+    errno.ECONNABORTED,
+    errno.ENETUNREACH,
+    errno.ENETDOWN,
+    errno.EHOSTUNREACH,
+    errno.EHOSTDOWN,
+})
+_KIND_PRIORITY = {
+    "timeout": 0,
+    "network": 1,
+    "authz": 2,
+    "auth": 2,
+    "rate_limit": 3,
+    "permission": 4,
+    "not_found": 5,
+}
+
+# Patterns like "retry after 60 seconds", matched against lowercased messages
+_RETRY_AFTER_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r"retry after (\d+)",
+    r"wait (\d+) seconds",
+    r"try again in (\d+)",
+    r"rate limit.*?(\d+).*?seconds"
+))
+
+# Service name -> one alternation over its keywords, in priority order
+_SERVICE_PATTERNS = tuple(
+    (service, re.compile("|".join(map(re.escape, keywords))))
+    for service, keywords in (
+        ("openai", ("openai", "gpt", "ai", "chat")),
+        ("nmap", ("nmap", "port", "scan")),
+        ("nuclei", ("nuclei", "vulnerability")),
+        ("database", ("database", "db", "sql", "postgres")),
+        ("redis", ("redis", "cache")),
+        ("http", ("http", "api", "request"))
+    )
+)
+
 
 class RetryStrategy(Enum):
     """Retry strategies"""
@@ -41,8 +102,37 @@ class RetryConfig:
     strategy: RetryStrategy = RetryStrategy.EXPONENTIAL_BACKOFF_JITTER
     multiplier: float = 2.0
     jitter_factor: float = 0.1
-    retryable_exceptions: Optional[List[Type[Exception]]] = None
-    non_retryable_exceptions: Optional[List[Type[Exception]]] = None
+    retryable_exceptions: Optional[Sequence[Type[Exception]]] = None
+    non_retryable_exceptions: Optional[Sequence[Type[Exception]]] = None
+    max_total_delay_seconds: Optional[float] = None  # give up once backoff would exceed this budget
+    run_sync_inline: bool = False  # call trivial sync functions on the event loop thread, not the executor
+    _base_delays: Optional[Tuple[float, ...]] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Tuples let _is_retryable check every type in one isinstance call
+        if self.retryable_exceptions is not None:
+            self.retryable_exceptions = tuple(self.retryable_exceptions)
+        if self.non_retryable_exceptions is not None:
+            self.non_retryable_exceptions = tuple(self.non_retryable_exceptions)
+    
+    def base_delay(self, attempt: int) -> float:
+        """Un-jittered, unclamped delay after the given attempt, from a schedule built on first use"""
+        delays = self._base_delays
+        if delays is None:
+            delays = self._base_delays = tuple(
+                self._strategy_delay(n) for n in range(1, self.max_attempts + 1)
+            )
+        if attempt <= len(delays):
+            return delays[attempt - 1]
+        return self._strategy_delay(attempt)
+    
+    def _strategy_delay(self, attempt: int) -> float:
+        """Delay for an attempt according to the retry strategy"""
+        if self.strategy == RetryStrategy.LINEAR_BACKOFF:
+            return self.base_delay_seconds * attempt
+        if self.strategy in (RetryStrategy.EXPONENTIAL_BACKOFF, RetryStrategy.EXPONENTIAL_BACKOFF_JITTER):
+            return self.base_delay_seconds * (self.multiplier ** (attempt - 1))
+        return self.base_delay_seconds
 
 
 @dataclass
@@ -52,15 +142,15 @@ class ErrorHandlingMetrics:
     retries_attempted: int = 0
     successful_retries: int = 0
     failed_retries: int = 0
-    errors_by_category: Dict[str, int] = None
-    errors_by_severity: Dict[str, int] = None
-    average_retry_delay: float = 0.0
+    errors_by_category: Counter = field(default_factory=Counter)
+    errors_by_severity: Counter = field(default_factory=Counter)
+    total_retry_delay: float = 0.0
+    retry_delay_count: int = 0
     
-    def __post_init__(self):
-        if self.errors_by_category is None:
-            self.errors_by_category = {}
-        if self.errors_by_severity is None:
-            self.errors_by_severity = {}
+    @property
+    def average_retry_delay(self) -> float:
+        """Mean of all non-zero retry delays"""
+        return self.total_retry_delay / self.retry_delay_count if self.retry_delay_count else 0.0
 
 
 class ErrorHandler:
@@ -87,6 +177,7 @@ class ErrorHandler:
         *args,
         retry_config: Optional[RetryConfig] = None,
         context: Optional[ErrorContext] = None,
+        _func_is_coro: Optional[bool] = None,
         **kwargs
     ) -> Any:
         """
@@ -97,6 +188,7 @@ class ErrorHandler:
             *args: Function arguments
             retry_config: Retry configuration
             context: Error context
+            _func_is_coro: Precomputed iscoroutinefunction(func), set by with_error_handling
             **kwargs: Function keyword arguments
             
         Returns:
@@ -105,126 +197,259 @@ class ErrorHandler:
         Raises:
             PhantomBaseException: Wrapped and classified exceptions
         """
+        is_coro = asyncio.iscoroutinefunction(func) if _func_is_coro is None else _func_is_coro
+        inline = not is_coro and retry_config is not None and retry_config.run_sync_inline
+        # loop stays None for coroutine functions and inline sync functions
+        loop = None if is_coro or inline else asyncio.get_running_loop()
+        start_time = perf_counter()
+        
+        # Fast path: the first attempt carries no retry bookkeeping
+        try:
+            if is_coro:
+                return await func(*args, **kwargs)
+            if inline:
+                return func(*args, **kwargs)
+            # run_in_executor only forwards positional arguments
+            return await loop.run_in_executor(None, partial(func, *args, **kwargs))
+        except Exception as exc:
+            first_exception = exc
+        
+        return await self._retry_loop(
+            first_exception, func, args, kwargs,
+            retry_config or RetryConfig(), context or ErrorContext(),
+            start_time, is_coro, loop
+        )
+    
+    def handle_with_retry_sync(
+        self,
+        func: Callable,
+        *args,
+        retry_config: Optional[RetryConfig] = None,
+        context: Optional[ErrorContext] = None,
+        **kwargs
+    ) -> Any:
+        """Execute a synchronous function with error handling and blocking retries"""
+        start_time = perf_counter()
+        
+        # Fast path: the first attempt carries no retry bookkeeping
+        try:
+            return func(*args, **kwargs)
+        except Exception as exc:
+            first_exception = exc
+        
         config = retry_config or RetryConfig()
         context = context or ErrorContext()
+        func_name = func.__name__
+        
+        last_exception = first_exception
+        retry_delays = []
+        
+        retry_delay = self._handle_failure(
+            first_exception, 1, config, context, func_name, perf_counter() - start_time, retry_delays
+        )
+        if retry_delay > 0:
+            time.sleep(retry_delay)
+        
+        for attempt in range(2, config.max_attempts + 1):
+            start_time = perf_counter()
+            
+            try:
+                self._log_retry_attempt(func_name, attempt, config, last_exception)
+                result = func(*args, **kwargs)
+                self._log_retry_success(func_name, attempt, perf_counter() - start_time, retry_delays)
+                return result
+            
+            except Exception as exc:
+                last_exception = exc
+                retry_delay = self._handle_failure(
+                    exc, attempt, config, context, func_name, perf_counter() - start_time, retry_delays
+                )
+                if retry_delay > 0:
+                    time.sleep(retry_delay)
         
-        last_exception = None
+        # _handle_failure raises on the final attempt, so the loop always returns or raises
+        raise RuntimeError("unreachable retry state")
+    
+    async def _retry_loop(
+        self,
+        first_exception: Exception,
+        func: Callable,
+        args: tuple,
+        kwargs: Dict[str, Any],
+        config: RetryConfig,
+        context: ErrorContext,
+        start_time: float,
+        is_coro: bool,
+        loop: Optional[asyncio.AbstractEventLoop]
+    ) -> Any:
+        """Slow path: handle the first failure and run the remaining attempts"""
+        func_name = func.__name__
+        
+        last_exception = first_exception
         retry_delays = []
         
-        for attempt in range(1, config.max_attempts + 1):
-            start_time = time.time()
+        retry_delay = self._handle_failure(
+            first_exception, 1, config, context, func_name, perf_counter() - start_time, retry_delays
+        )
+        if retry_delay > 0:
+            await asyncio.sleep(retry_delay)
+        
+        for attempt in range(2, config.max_attempts + 1):
+            start_time = perf_counter()
             
             try:
-                # Log attempt
-                if attempt > 1:
-                    self.logger.info(
-                        f"Retry attempt {attempt}/{config.max_attempts} for operation",
-                        event_type=EventType.SYSTEM_EVENT,
-                        metadata={
-                            "function": func.__name__,
-                            "attempt": attempt,
-                            "max_attempts": config.max_attempts,
-                            "previous_error": str(last_exception) if last_exception else None
-                        }
-                    )
+                self._log_retry_attempt(func_name, attempt, config, last_exception)
                 
                 # Execute function
-                if asyncio.iscoroutinefunction(func):
+                if is_coro:
                     result = await func(*args, **kwargs)
+                elif loop is None:
+                    result = func(*args, **kwargs)
                 else:
-                    result = await asyncio.get_event_loop().run_in_executor(
-                        None, func, *args, **kwargs
-                    )
-                
-                # Success - log and return
-                execution_time = time.time() - start_time
-                
-                if attempt > 1:
-                    self.metrics.successful_retries += 1
-                    self.logger.info(
-                        f"Operation succeeded after {attempt} attempts",
-                        event_type=EventType.SYSTEM_EVENT,
-                        performance_metrics={"execution_time_ms": execution_time * 1000},
-                        metadata={
-                            "function": func.__name__,
-                            "total_attempts": attempt,
-                            "retry_delays": retry_delays
-                        }
-                    )
+                    result = await loop.run_in_executor(None, partial(func, *args, **kwargs))
                 
+                self._log_retry_success(func_name, attempt, perf_counter() - start_time, retry_delays)
                 return result
-                
+            
             except Exception as exc:
-                execution_time = time.time() - start_time
                 last_exception = exc
-                
-                # Classify and wrap exception
-                phantom_exc = self._classify_exception(exc, context, func.__name__)
-                
-                # Update metrics
-                self.metrics.total_errors += 1
-                self._update_error_metrics(phantom_exc)
-                
-                # Check if retryable
-                if not self._is_retryable(phantom_exc, config):
-                    self.logger.error(
-                        f"Non-retryable error in operation: {phantom_exc.message}",
-                        error=phantom_exc,
-                        event_type=EventType.ERROR_OCCURRED,
-                        metadata={
-                            "function": func.__name__,
-                            "attempt": attempt,
-                            "error_category": phantom_exc.category.value,
-                            "error_severity": phantom_exc.severity.value
-                        }
-                    )
-                    raise phantom_exc
-                
-                # Check if we should retry
-                if attempt >= config.max_attempts:
-                    self.metrics.failed_retries += 1
-                    self.logger.error(
-                        f"Operation failed after {config.max_attempts} attempts: {phantom_exc.message}",
-                        error=phantom_exc,
-                        event_type=EventType.ERROR_OCCURRED,
-                        metadata={
-                            "function": func.__name__,
-                            "total_attempts": attempt,
-                            "retry_delays": retry_delays,
-                            "final_error_category": phantom_exc.category.value
-                        }
-                    )
-                    raise phantom_exc
-                
-                # Calculate retry delay
-                retry_delay = self._calculate_retry_delay(
-                    phantom_exc, attempt, config
+                retry_delay = self._handle_failure(
+                    exc, attempt, config, context, func_name, perf_counter() - start_time, retry_delays
                 )
-                retry_delays.append(retry_delay)
-                
-                self.metrics.retries_attempted += 1
-                
-                # Log retry decision
-                self.logger.warning(
-                    f"Operation failed (attempt {attempt}), retrying in {retry_delay}s: {phantom_exc.message}",
+                if retry_delay > 0:
+                    await asyncio.sleep(retry_delay)
+        
+        # _handle_failure raises on the final attempt, so the loop always returns or raises
+        raise RuntimeError("unreachable retry state")
+    
+    def _log_retry_attempt(
+        self,
+        func_name: str,
+        attempt: int,
+        config: RetryConfig,
+        last_exception: Optional[Exception]
+    ):
+        """Log the start of a retry attempt"""
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                f"Retry attempt {attempt}/{config.max_attempts} for operation",
+                event_type=EventType.SYSTEM_EVENT,
+                metadata={
+                    "function": func_name,
+                    "attempt": attempt,
+                    "max_attempts": config.max_attempts,
+                    "previous_error": str(last_exception) if last_exception else None
+                }
+            )
+    
+    def _log_retry_success(
+        self,
+        func_name: str,
+        attempt: int,
+        execution_time: float,
+        retry_delays: List[float]
+    ):
+        """Record and log an operation that succeeded on a retry"""
+        self.metrics.successful_retries += 1
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                f"Operation succeeded after {attempt} attempts",
+                event_type=EventType.SYSTEM_EVENT,
+                performance_metrics={"execution_time_ms": execution_time * 1000},
+                metadata={
+                    "function": func_name,
+                    "total_attempts": attempt,
+                    "retry_delays": retry_delays
+                }
+            )
+    
+    def _handle_failure(
+        self,
+        exc: Exception,
+        attempt: int,
+        config: RetryConfig,
+        context: ErrorContext,
+        func_name: str,
+        execution_time: float,
+        retry_delays: List[float]
+    ) -> float:
+        """Classify a failed attempt, raise if it is final, otherwise return the delay before the next one"""
+        logger = self.logger
+        metrics = self.metrics
+        
+        # Classify and wrap exception
+        phantom_exc = self._classify_exception(exc, context, func_name)
+        category = phantom_exc.category.value
+        severity = phantom_exc.severity.value
+        message = phantom_exc.message
+        
+        # Update metrics
+        metrics.total_errors += 1
+        self._update_error_metrics(category, severity)
+        
+        # Check if retryable
+        if not self._is_retryable(phantom_exc, config):
+            if logger.isEnabledFor(logging.ERROR):
+                logger.error(
+                    f"Non-retryable error in operation: {message}",
+                    error=phantom_exc,
                     event_type=EventType.ERROR_OCCURRED,
-                    performance_metrics={"execution_time_ms": execution_time * 1000},
                     metadata={
-                        "function": func.__name__,
+                        "function": func_name,
                         "attempt": attempt,
-                        "max_attempts": config.max_attempts,
-                        "retry_delay_seconds": retry_delay,
-                        "error_category": phantom_exc.category.value,
-                        "error_code": phantom_exc.error_code
+                        "error_category": category,
+                        "error_severity": severity
                     }
                 )
-                
-                # Wait before retry
-                if retry_delay > 0:
-                    await asyncio.sleep(retry_delay)
+            raise phantom_exc
+        
+        # Check if we should retry; the delay is only computed when another attempt follows
+        retry_delay = None
+        if attempt < config.max_attempts:
+            retry_delay = self._calculate_retry_delay(
+                phantom_exc, attempt, config
+            )
+            budget = config.max_total_delay_seconds
+            if budget is not None and sum(retry_delays) + retry_delay > budget:
+                retry_delay = None
+        
+        if retry_delay is None:
+            metrics.failed_retries += 1
+            if logger.isEnabledFor(logging.ERROR):
+                logger.error(
+                    f"Operation failed after {attempt} attempts: {message}",
+                    error=phantom_exc,
+                    event_type=EventType.ERROR_OCCURRED,
+                    metadata={
+                        "function": func_name,
+                        "total_attempts": attempt,
+                        "retry_delays": retry_delays,
+                        "final_error_category": category
+                    }
+                )
+            raise phantom_exc
+        
+        retry_delays.append(retry_delay)
+        
+        metrics.retries_attempted += 1
+        
+        # Log retry decision
+        if logger.isEnabledFor(logging.WARNING):
+            logger.warning(
+                f"Operation failed (attempt {attempt}), retrying in {retry_delay}s: {message}",
+                event_type=EventType.ERROR_OCCURRED,
+                performance_metrics={"execution_time_ms": execution_time * 1000},
+                metadata={
+                    "function": func_name,
+                    "attempt": attempt,
+                    "max_attempts": config.max_attempts,
+                    "retry_delay_seconds": retry_delay,
+                    "error_category": category,
+                    "error_code": phantom_exc.error_code
+                }
+            )
         
-        # This should never be reached, but just in case
-        raise last_exception or Exception("Unknown error in retry logic")
+        return retry_delay
     
     def _classify_exception(
         self, 
@@ -239,43 +464,54 @@ class ErrorHandler:
             if not exc.context.correlation_id and context.correlation_id:
                 exc.context = context
             if not exc.context.operation:
-                exc.context.operation = operation
+                if exc.context is EMPTY_ERROR_CONTEXT:
+                    exc.context = ErrorContext(operation=operation)
+                else:
+                    exc.context.operation = operation
             return exc
         
-        # Classify by exception type and message
-        exc_str = str(exc).lower()
-        exc_type = type(exc).__name__
+        # Classify by exception type and message in a single scan
+        exc_msg = str(exc)
+        exc_str = exc_msg.lower()
+        kinds = {match.lastgroup for match in _MESSAGE_KIND_PATTERN.finditer(exc_str)}
+        for exc_types, kind in _TYPE_KINDS:
+            if isinstance(exc, exc_types):
+                kinds.add(kind)
+        
+        # OS-level network failures are identified by errno, whatever the message says
+        if isinstance(exc, OSError) and exc.errno in _NETWORK_ERRNOS:
+            kinds.add("network")
+        
+        kind = min(kinds, key=_KIND_PRIORITY.__getitem__) if kinds else None
         
         # Timeout errors
-        if isinstance(exc, (asyncio.TimeoutError, TimeoutError)) or "timeout" in exc_str:
+        if kind == "timeout":
             return TimeoutException(operation, 30.0, context=context, cause=exc)
         
         # Network errors
-        if isinstance(exc, ConnectionError) or any(
-            keyword in exc_str for keyword in ["connection", "network", "unreachable", "refused"]
-        ):
-            return NetworkException(f"Network error in {operation}: {str(exc)}", context=context, cause=exc)
+        if kind == "network":
+            return NetworkException(f"Network error in {operation}: {exc_msg}", context=context, cause=exc)
         
         # Authentication/Authorization
-        if any(keyword in exc_str for keyword in ["auth", "unauthorized", "forbidden", "credentials"]):
+        if kind == "authz" or kind == "auth":
             from .exceptions import AuthenticationException, AuthorizationException
-            if "forbidden" in exc_str or "authorization" in exc_str:
+            if "authz" in kinds:
                 return AuthorizationException(f"Authorization failed in {operation}", context=context, cause=exc)
             else:
                 return AuthenticationException(f"Authentication failed in {operation}", context=context, cause=exc)
         
         # Rate limiting
-        if any(keyword in exc_str for keyword in ["rate limit", "too many requests", "quota exceeded"]):
+        if kind == "rate_limit":
             retry_after = self._extract_retry_after(exc_str)
             return RateLimitException(f"Rate limit exceeded in {operation}", retry_after=retry_after, context=context, cause=exc)
         
         # Permission errors
-        if isinstance(exc, PermissionError) or "permission" in exc_str:
+        if kind == "permission":
             from .exceptions import FilePermissionException
             return FilePermissionException("unknown", operation, context=context, cause=exc)
         
         # File not found
-        if isinstance(exc, FileNotFoundError) or "not found" in exc_str:
+        if kind == "not_found":
             from .exceptions import FileNotFoundException
             return FileNotFoundException("unknown", context=context, cause=exc)
         
@@ -283,7 +519,7 @@ class ErrorHandler:
         service_name = self._extract_service_name(operation, exc_str)
         return ExternalServiceException(
             service_name, 
-            f"Error in {operation}: {str(exc)}", 
+            f"Error in {operation}: {exc_msg}", 
             context=context, 
             cause=exc
         )
@@ -291,15 +527,15 @@ class ErrorHandler:
     def _is_retryable(self, exc: PhantomBaseException, config: RetryConfig) -> bool:
         """Check if exception is retryable based on configuration"""
         
+        cause = exc.cause
+        
         # Check explicit non-retryable exceptions
-        if config.non_retryable_exceptions:
-            if any(isinstance(exc.cause, exc_type) for exc_type in config.non_retryable_exceptions):
-                return False
+        if config.non_retryable_exceptions and isinstance(cause, config.non_retryable_exceptions):
+            return False
         
         # Check explicit retryable exceptions
-        if config.retryable_exceptions:
-            if any(isinstance(exc.cause, exc_type) for exc_type in config.retryable_exceptions):
-                return True
+        if config.retryable_exceptions and isinstance(cause, config.retryable_exceptions):
+            return True
         
         # Use built-in retryable logic
         return is_retryable_error(exc)
@@ -316,64 +552,34 @@ class ErrorHandler:
         if hasattr(exc, 'retry_after') and exc.retry_after:
             return min(exc.retry_after, config.max_delay_seconds)
         
-        # Use strategy-based calculation
-        if config.strategy == RetryStrategy.FIXED_DELAY:
-            delay = config.base_delay_seconds
-            
-        elif config.strategy == RetryStrategy.LINEAR_BACKOFF:
-            delay = config.base_delay_seconds * attempt
-            
-        elif config.strategy == RetryStrategy.EXPONENTIAL_BACKOFF:
-            delay = config.base_delay_seconds * (config.multiplier ** (attempt - 1))
-            
-        elif config.strategy == RetryStrategy.EXPONENTIAL_BACKOFF_JITTER:
-            base_delay = config.base_delay_seconds * (config.multiplier ** (attempt - 1))
-            jitter = base_delay * config.jitter_factor * (random.random() - 0.5)
-            delay = base_delay + jitter
-            
-        else:
-            delay = config.base_delay_seconds
+        # Strategy-based delay from the precomputed schedule
+        delay = config.base_delay(attempt)
+        
+        if config.strategy == RetryStrategy.EXPONENTIAL_BACKOFF_JITTER:
+            spread = delay * config.jitter_factor * 0.5
+            delay += random.uniform(-spread, spread)
         
         # Ensure delay is within bounds
         delay = max(0, min(config.max_delay_seconds, delay))
         
         # Update metrics
         if delay > 0:
-            total_delays = len([d for d in [delay] if d > 0])
-            if total_delays > 0:
-                self.metrics.average_retry_delay = (
-                    self.metrics.average_retry_delay + delay
-                ) / (total_delays + 1)
+            self.metrics.total_retry_delay += delay
+            self.metrics.retry_delay_count += 1
         
         return delay
     
-    def _update_error_metrics(self, exc: PhantomBaseException):
+    def _update_error_metrics(self, category: str, severity: str):
         """Update error metrics"""
-        category_key = exc.category.value
-        severity_key = exc.severity.value
-        
-        self.metrics.errors_by_category[category_key] = (
-            self.metrics.errors_by_category.get(category_key, 0) + 1
-        )
-        
-        self.metrics.errors_by_severity[severity_key] = (
-            self.metrics.errors_by_severity.get(severity_key, 0) + 1
-        )
+        self.metrics.errors_by_category[category] += 1
+        self.metrics.errors_by_severity[severity] += 1
     
     def _extract_retry_after(self, error_message: str) -> int:
         """Extract retry-after value from error message"""
-        import re
-        
-        # Look for patterns like "retry after 60 seconds"
-        patterns = [
-            r"retry after (\d+)",
-            r"wait (\d+) seconds",
-            r"try again in (\d+)",
-            r"rate limit.*?(\d+).*?seconds"
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, error_message.lower())
+        error_lower = error_message.lower()
+        
+        for pattern in _RETRY_AFTER_PATTERNS:
+            match = pattern.search(error_lower)
             if match:
                 return int(match.group(1))
         
@@ -381,22 +587,11 @@ class ErrorHandler:
     
     def _extract_service_name(self, operation: str, error_message: str) -> str:
         """Extract service name from operation or error message"""
-        
-        # Common service keywords
-        services = {
-            "openai": ["openai", "gpt", "ai", "chat"],
-            "nmap": ["nmap", "port", "scan"],
-            "nuclei": ["nuclei", "vulnerability"],
-            "database": ["database", "db", "sql", "postgres"],
-            "redis": ["redis", "cache"],
-            "http": ["http", "api", "request"]
-        }
-        
         operation_lower = operation.lower()
         error_lower = error_message.lower()
         
-        for service, keywords in services.items():
-            if any(keyword in operation_lower or keyword in error_lower for keyword in keywords):
+        for service, pattern in _SERVICE_PATTERNS:
+            if pattern.search(operation_lower) or pattern.search(error_lower):
                 return service
         
         return "unknown"
@@ -414,8 +609,8 @@ class ErrorHandler:
                 if self.metrics.retries_attempted > 0 else 0
             ),
             "average_retry_delay_seconds": self.metrics.average_retry_delay,
-            "errors_by_category": self.metrics.errors_by_category,
-            "errors_by_severity": self.metrics.errors_by_severity
+            "errors_by_category": dict(self.metrics.errors_by_category),
+            "errors_by_severity": dict(self.metrics.errors_by_severity)
         }
     
     def reset_metrics(self):
@@ -432,9 +627,11 @@ class GlobalErrorHandler:
     
     def get_handler(self, name: str) -> ErrorHandler:
         """Get or create error handler"""
-        if name not in self.handlers:
-            self.handlers[name] = ErrorHandler(name)
-        return self.handlers[name]
+        handler = self.handlers.get(name)
+        if handler is None:
+            # setdefault is atomic, so racing creators all end up with the same handler
+            handler = self.handlers.setdefault(name, ErrorHandler(name))
+        return handler
     
     def set_default_config(self, config: RetryConfig):
         """Set default retry configuration"""
@@ -447,12 +644,29 @@ class GlobalErrorHandler:
         handler_name: str = "default",
         retry_config: Optional[RetryConfig] = None,
         context: Optional[ErrorContext] = None,
+        _func_is_coro: Optional[bool] = None,
         **kwargs
     ) -> Any:
         """Handle function execution with error handling and retries"""
         handler = self.get_handler(handler_name)
         config = retry_config or self.default_config
-        return await handler.handle_with_retry(func, *args, retry_config=config, context=context, **kwargs)
+        return await handler.handle_with_retry(
+            func, *args, retry_config=config, context=context, _func_is_coro=_func_is_coro, **kwargs
+        )
+    
+    def handle_with_retry_sync(
+        self,
+        func: Callable,
+        *args,
+        handler_name: str = "default",
+        retry_config: Optional[RetryConfig] = None,
+        context: Optional[ErrorContext] = None,
+        **kwargs
+    ) -> Any:
+        """Handle synchronous function execution with error handling and retries"""
+        handler = self.get_handler(handler_name)
+        config = retry_config or self.default_config
+        return handler.handle_with_retry_sync(func, *args, retry_config=config, context=context, **kwargs)
     
     def get_all_metrics(self) -> Dict[str, Dict[str, Any]]:
         """Get metrics from all error handlers"""
@@ -478,27 +692,36 @@ def with_error_handling(
             pass
     """
     def decorator(func):
-        @wraps(func)
-        async def async_wrapper(*args, **kwargs):
-            return await global_error_handler.handle_with_retry(
-                func, *args, 
-                handler_name=handler_name,
-                retry_config=retry_config,
-                context=context,
-                **kwargs
-            )
+        if asyncio.iscoroutinefunction(func):
+            handle = global_error_handler.handle_with_retry
+            
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await handle(
+                    func, *args, 
+                    handler_name=handler_name,
+                    retry_config=retry_config,
+                    context=context,
+                    _func_is_coro=True,
+                    **kwargs
+                )
+            
+            return async_wrapper
+        
+        handle_sync = global_error_handler.handle_with_retry_sync
         
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
-            return asyncio.run(global_error_handler.handle_with_retry(
+            # Retries run inline with blocking sleeps; no event loop per call
+            return handle_sync(
                 func, *args,
                 handler_name=handler_name,
                 retry_config=retry_config,
                 context=context,
                 **kwargs
-            ))
+            )
         
-        return async_wrapper if asyncio.iscoroutinefunction(func) else sync_wrapper
+        return sync_wrapper
     return decorator
 
 
@@ -2,14 +2,27 @@
 Standardized Exception Classes for PHANTOM Security AI
 """
 
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable
+from types import MappingProxyType
 from enum import Enum
 from dataclasses import dataclass
+from functools import cached_property
+import json
+import re
+import sys
+import time
 import traceback
 from datetime import datetime
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
 
-class ErrorCategory(Enum):
+
+class ErrorCategory(str, Enum):
     """Categories of errors for classification and handling"""
     AUTHENTICATION = "authentication"
     AUTHORIZATION = "authorization"
@@ -27,7 +40,7 @@ class ErrorCategory(Enum):
     UNKNOWN = "unknown"
 
 
-class ErrorSeverity(Enum):
+class ErrorSeverity(str, Enum):
     """Severity levels for errors"""
     LOW = "low"
     MEDIUM = "medium"
@@ -35,7 +48,21 @@ class ErrorSeverity(Enum):
     CRITICAL = "critical"
 
 
-@dataclass
+# Default user-friendly messages by category
+_USER_MESSAGES: Dict[ErrorCategory, str] = {
+    ErrorCategory.AUTHENTICATION: "Authentication failed. Please check your credentials.",
+    ErrorCategory.AUTHORIZATION: "You don't have permission to perform this action.",
+    ErrorCategory.VALIDATION: "The provided data is invalid. Please check your input.",
+    ErrorCategory.EXTERNAL_SERVICE: "An external service is currently unavailable. Please try again later.",
+    ErrorCategory.RATE_LIMITING: "Too many requests. Please wait before trying again.",
+    ErrorCategory.TIMEOUT: "The operation timed out. Please try again.",
+    ErrorCategory.SYSTEM: "A system error occurred. Please contact support if the issue persists."
+}
+_DEFAULT_USER_MESSAGE = "An unexpected error occurred. Please try again."
+_get_user_message = _USER_MESSAGES.get
+
+
+@dataclass(slots=True)
 class ErrorContext:
     """Context information for errors"""
     correlation_id: Optional[str] = None
@@ -49,16 +76,36 @@ class ErrorContext:
     def __post_init__(self):
         if self.metadata is None:
             self.metadata = {}
+    
+    def __reduce_ex__(self, protocol):
+        # The shared empty context pickles and copies by reference to stay a singleton
+        if self is EMPTY_ERROR_CONTEXT:
+            return "EMPTY_ERROR_CONTEXT"
+        return object.__reduce_ex__(self, protocol)
+
+
+# Shared context for exceptions raised without one; never mutate it in place
+EMPTY_ERROR_CONTEXT = ErrorContext(metadata=MappingProxyType({}))
 
 
 class PhantomBaseException(Exception):
     """Base exception for all PHANTOM Security AI errors"""
     
+    # Per-class defaults; error code and user message are resolved in __init_subclass__
+    default_category: ErrorCategory = ErrorCategory.UNKNOWN
+    default_severity: ErrorSeverity = ErrorSeverity.MEDIUM
+    _default_error_code: str
+    _default_user_message: str
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._resolve_class_defaults()
+    
     def __init__(
         self,
         message: str,
-        category: ErrorCategory = ErrorCategory.UNKNOWN,
-        severity: ErrorSeverity = ErrorSeverity.MEDIUM,
+        category: Optional[ErrorCategory] = None,
+        severity: Optional[ErrorSeverity] = None,
         error_code: Optional[str] = None,
         context: Optional[ErrorContext] = None,
         cause: Optional[Exception] = None,
@@ -66,80 +113,124 @@ class PhantomBaseException(Exception):
         user_message: Optional[str] = None
     ):
         super().__init__(message)
+        cls = type(self)
         self.message = message
-        self.category = category
-        self.severity = severity
-        self.error_code = error_code or self._generate_error_code()
-        self.context = context or ErrorContext()
+        self.severity = severity or cls.default_severity
+        if category is None or category is cls.default_category:
+            self.category = cls.default_category
+            self.error_code = error_code or cls._default_error_code
+            self.user_message = user_message or cls._default_user_message
+        else:
+            self.category = category
+            self.error_code = error_code or cls._cached_error_code_for(category)
+            self.user_message = user_message or self._get_user_friendly_message()
+        self.context = context if context is not None else EMPTY_ERROR_CONTEXT
         self.cause = cause
         self.retry_after = retry_after
-        self.user_message = user_message or self._get_user_friendly_message()
-        self.timestamp = datetime.utcnow()
-        self.traceback_str = traceback.format_exc()
-    
-    def _generate_error_code(self) -> str:
-        """Generate error code based on exception class"""
-        class_name = self.__class__.__name__
-        return f"{self.category.value.upper()}_{class_name.upper().replace('EXCEPTION', '')}"
+        self._ts = time.time()
+    
+    @cached_property
+    def timestamp(self) -> datetime:
+        """UTC creation time of the exception"""
+        return datetime.utcfromtimestamp(self._ts)
+    
+    @cached_property
+    def timestamp_iso(self) -> str:
+        """ISO formatted creation time, built on first access"""
+        return self.timestamp.isoformat()
+    
+    @cached_property
+    def traceback_str(self) -> str:
+        """Formatted traceback, built on first access"""
+        if self.cause is not None:
+            return "".join(traceback.format_exception(type(self.cause), self.cause, self.cause.__traceback__))
+        if self.__traceback__ is not None:
+            return "".join(traceback.format_exception(type(self), self, self.__traceback__))
+        return traceback.format_exc()
+    
+    @cached_property
+    def caused_by(self) -> Optional[str]:
+        """Message of the underlying cause, stringified once"""
+        cause = self.cause
+        if cause is None:
+            return None
+        if isinstance(cause, PhantomBaseException):
+            return cause.message
+        return str(cause)
+    
+    @classmethod
+    def _resolve_class_defaults(cls):
+        """Resolve the default error code and user message once per class"""
+        cls._default_error_code = cls._cached_error_code_for(cls.default_category)
+        cls._default_user_message = _get_user_message(cls.default_category, _DEFAULT_USER_MESSAGE)
+    
+    @classmethod
+    def _cached_error_code_for(cls, category: ErrorCategory) -> str:
+        """Get the error code for this class and category, generating it once"""
+        codes = cls.__dict__.get("_error_codes")
+        if codes is None:
+            codes = {}
+            cls._error_codes = codes
+        code = codes.get(category)
+        if code is None:
+            code = sys.intern(f"{category.value.upper()}_{cls.__name__.upper().replace('EXCEPTION', '')}")
+            codes[category] = code
+        return code
     
     def _get_user_friendly_message(self) -> str:
         """Get user-friendly error message"""
-        # Default user-friendly messages by category
-        user_messages = {
-            ErrorCategory.AUTHENTICATION: "Authentication failed. Please check your credentials.",
-            ErrorCategory.AUTHORIZATION: "You don't have permission to perform this action.",
-            ErrorCategory.VALIDATION: "The provided data is invalid. Please check your input.",
-            ErrorCategory.EXTERNAL_SERVICE: "An external service is currently unavailable. Please try again later.",
-            ErrorCategory.RATE_LIMITING: "Too many requests. Please wait before trying again.",
-            ErrorCategory.TIMEOUT: "The operation timed out. Please try again.",
-            ErrorCategory.SYSTEM: "A system error occurred. Please contact support if the issue persists."
-        }
-        return user_messages.get(self.category, "An unexpected error occurred. Please try again.")
+        return _get_user_message(self.category, _DEFAULT_USER_MESSAGE)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert exception to dictionary for API responses"""
+        ctx = self.context
         return {
             "error": True,
             "error_code": self.error_code,
             "message": self.message,
             "user_message": self.user_message,
-            "category": self.category.value,
-            "severity": self.severity.value,
-            "timestamp": self.timestamp.isoformat(),
+            "category": self.category,
+            "severity": self.severity,
+            "timestamp": self.timestamp_iso,
             "context": {
-                "correlation_id": self.context.correlation_id,
-                "request_id": self.context.request_id,
-                "operation": self.context.operation,
-                "component": self.context.component
+                "correlation_id": ctx.correlation_id,
+                "request_id": ctx.request_id,
+                "operation": ctx.operation,
+                "component": ctx.component
             },
             "retry_after": self.retry_after,
-            "caused_by": str(self.cause) if self.cause else None
+            "caused_by": self.caused_by
         }
+    
+    def to_json_bytes(self) -> bytes:
+        """Serialize the to_dict() payload to JSON bytes, using orjson when available"""
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(self.to_dict())
+        return json.dumps(self.to_dict()).encode()
+
+
+PhantomBaseException._resolve_class_defaults()
 
 
 # Authentication & Authorization Exceptions
 class AuthenticationException(PhantomBaseException):
     """Authentication related errors"""
     
+    default_category = ErrorCategory.AUTHENTICATION
+    default_severity = ErrorSeverity.HIGH
+    
     def __init__(self, message: str = "Authentication failed", **kwargs):
-        super().__init__(
-            message,
-            category=ErrorCategory.AUTHENTICATION,
-            severity=ErrorSeverity.HIGH,
-            **kwargs
-        )
+        super().__init__(message, **kwargs)
 
 
 class AuthorizationException(PhantomBaseException):
     """Authorization related errors"""
     
+    default_category = ErrorCategory.AUTHORIZATION
+    default_severity = ErrorSeverity.HIGH
+    
     def __init__(self, message: str = "Access denied", **kwargs):
-        super().__init__(
-            message,
-            category=ErrorCategory.AUTHORIZATION,
-            severity=ErrorSeverity.HIGH,
-            **kwargs
-        )
+        super().__init__(message, **kwargs)
 
 
 class InvalidTokenException(AuthenticationException):
@@ -153,13 +244,11 @@ class InvalidTokenException(AuthenticationException):
 class ValidationException(PhantomBaseException):
     """Data validation errors"""
     
+    default_category = ErrorCategory.VALIDATION
+    default_severity = ErrorSeverity.MEDIUM
+    
     def __init__(self, message: str, field_errors: Optional[Dict[str, List[str]]] = None, **kwargs):
-        super().__init__(
-            message,
-            category=ErrorCategory.VALIDATION,
-            severity=ErrorSeverity.MEDIUM,
-            **kwargs
-        )
+        super().__init__(message, **kwargs)
         self.field_errors = field_errors or {}
 
 
@@ -182,13 +271,8 @@ class MissingParameterException(ValidationException):
 class BusinessLogicException(PhantomBaseException):
     """Business logic violation errors"""
     
-    def __init__(self, message: str, **kwargs):
-        super().__init__(
-            message,
-            category=ErrorCategory.BUSINESS_LOGIC,
-            severity=ErrorSeverity.MEDIUM,
-            **kwargs
-        )
+    default_category = ErrorCategory.BUSINESS_LOGIC
+    default_severity = ErrorSeverity.MEDIUM
 
 
 class ScanNotFoundException(BusinessLogicException):
@@ -218,13 +302,11 @@ class InvalidScanConfigurationException(BusinessLogicException):
 class ExternalServiceException(PhantomBaseException):
     """External service related errors"""
     
+    default_category = ErrorCategory.EXTERNAL_SERVICE
+    default_severity = ErrorSeverity.HIGH
+    
     def __init__(self, service_name: str, message: str, **kwargs):
-        super().__init__(
-            f"External service '{service_name}': {message}",
-            category=ErrorCategory.EXTERNAL_SERVICE,
-            severity=ErrorSeverity.HIGH,
-            **kwargs
-        )
+        super().__init__(f"External service '{service_name}': {message}", **kwargs)
         self.service_name = service_name
 
 
@@ -253,13 +335,8 @@ class NucleiServiceException(ExternalServiceException):
 class NetworkException(PhantomBaseException):
     """Network related errors"""
     
-    def __init__(self, message: str, **kwargs):
-        super().__init__(
-            message,
-            category=ErrorCategory.NETWORK,
-            severity=ErrorSeverity.HIGH,
-            **kwargs
-        )
+    default_category = ErrorCategory.NETWORK
+    default_severity = ErrorSeverity.HIGH
 
 
 class ConnectionTimeoutException(NetworkException):
@@ -282,13 +359,8 @@ class DNSResolutionException(NetworkException):
 class DatabaseException(PhantomBaseException):
     """Database related errors"""
     
-    def __init__(self, message: str, **kwargs):
-        super().__init__(
-            message,
-            category=ErrorCategory.DATABASE,
-            severity=ErrorSeverity.HIGH,
-            **kwargs
-        )
+    default_category = ErrorCategory.DATABASE
+    default_severity = ErrorSeverity.HIGH
 
 
 class DatabaseConnectionException(DatabaseException):
@@ -311,11 +383,12 @@ class DatabaseQueryException(DatabaseException):
 class RateLimitException(PhantomBaseException):
     """Rate limiting related errors"""
     
+    default_category = ErrorCategory.RATE_LIMITING
+    default_severity = ErrorSeverity.MEDIUM
+    
     def __init__(self, message: str, retry_after: int = 60, **kwargs):
         super().__init__(
             message,
-            category=ErrorCategory.RATE_LIMITING,
-            severity=ErrorSeverity.MEDIUM,
             retry_after=retry_after,
             **kwargs
         )
@@ -333,13 +406,8 @@ class APIRateLimitExceededException(RateLimitException):
 class CircuitBreakerException(PhantomBaseException):
     """Circuit breaker related errors"""
     
-    def __init__(self, message: str, **kwargs):
-        super().__init__(
-            message,
-            category=ErrorCategory.CIRCUIT_BREAKER,
-            severity=ErrorSeverity.HIGH,
-            **kwargs
-        )
+    default_category = ErrorCategory.CIRCUIT_BREAKER
+    default_severity = ErrorSeverity.HIGH
 
 
 class CircuitOpenException(CircuitBreakerException):
@@ -354,14 +422,12 @@ class CircuitOpenException(CircuitBreakerException):
 class TimeoutException(PhantomBaseException):
     """Timeout related errors"""
     
+    default_category = ErrorCategory.TIMEOUT
+    default_severity = ErrorSeverity.HIGH
+    
     def __init__(self, operation: str, timeout: float, **kwargs):
         message = f"Operation '{operation}' timed out after {timeout}s"
-        super().__init__(
-            message,
-            category=ErrorCategory.TIMEOUT,
-            severity=ErrorSeverity.HIGH,
-            **kwargs
-        )
+        super().__init__(message, **kwargs)
         self.timeout = timeout
 
 
@@ -376,13 +442,8 @@ class ScanTimeoutException(TimeoutException):
 class SecurityException(PhantomBaseException):
     """Security related errors"""
     
-    def __init__(self, message: str, **kwargs):
-        super().__init__(
-            message,
-            category=ErrorCategory.SECURITY,
-            severity=ErrorSeverity.CRITICAL,
-            **kwargs
-        )
+    default_category = ErrorCategory.SECURITY
+    default_severity = ErrorSeverity.CRITICAL
 
 
 class UnauthorizedTargetException(SecurityException):
@@ -405,13 +466,8 @@ class SecurityPolicyViolationException(SecurityException):
 class SystemException(PhantomBaseException):
     """System level errors"""
     
-    def __init__(self, message: str, **kwargs):
-        super().__init__(
-            message,
-            category=ErrorCategory.SYSTEM,
-            severity=ErrorSeverity.CRITICAL,
-            **kwargs
-        )
+    default_category = ErrorCategory.SYSTEM
+    default_severity = ErrorSeverity.CRITICAL
 
 
 class ResourceExhaustedException(SystemException):
@@ -433,13 +489,8 @@ class ConfigurationException(SystemException):
 class FileSystemException(PhantomBaseException):
     """File system related errors"""
     
-    def __init__(self, message: str, **kwargs):
-        super().__init__(
-            message,
-            category=ErrorCategory.FILE_SYSTEM,
-            severity=ErrorSeverity.MEDIUM,
-            **kwargs
-        )
+    default_category = ErrorCategory.FILE_SYSTEM
+    default_severity = ErrorSeverity.MEDIUM
 
 
 class FileNotFoundException(FileSystemException):
@@ -467,6 +518,23 @@ class DiskSpaceException(FileSystemException):
 
 
 # Utility functions for exception handling
+_RETRYABLE_CATEGORIES = frozenset({
+    ErrorCategory.NETWORK,
+    ErrorCategory.EXTERNAL_SERVICE,
+    ErrorCategory.TIMEOUT,
+    ErrorCategory.RATE_LIMITING
+})
+
+# Common retryable exception types
+_RETRYABLE_TYPES = (
+    ConnectionError,
+    TimeoutError,
+)
+
+_AUTH_PATTERN = re.compile(r"authentication|unauthorized", re.IGNORECASE)
+_PERMISSION_PATTERN = re.compile(r"permission|forbidden", re.IGNORECASE)
+
+
 def create_error_context(
     correlation_id: Optional[str] = None,
     request_id: Optional[str] = None,
@@ -488,6 +556,33 @@ def create_error_context(
     )
 
 
+def _wrap_timeout(exc, service_name, operation, context):
+    return TimeoutException(operation, 30.0, context=context, cause=exc)
+
+
+def _wrap_connection(exc, service_name, operation, context):
+    return NetworkException(f"Connection error during {operation}", context=context, cause=exc)
+
+
+# Exception type -> wrapper factory, checked in order; resolutions are memoized per concrete type
+_EXCEPTION_WRAPPERS: Dict[type, Callable[..., PhantomBaseException]] = {
+    TimeoutError: _wrap_timeout,
+    ConnectionError: _wrap_connection,
+}
+_resolved_wrappers: Dict[type, Optional[Callable[..., PhantomBaseException]]] = {}
+
+
+def _resolve_wrapper(exc_type: type) -> Optional[Callable[..., PhantomBaseException]]:
+    """Find the first wrapper factory whose registered type matches exc_type"""
+    factory = None
+    for registered_type, candidate in _EXCEPTION_WRAPPERS.items():
+        if issubclass(exc_type, registered_type):
+            factory = candidate
+            break
+    _resolved_wrappers[exc_type] = factory
+    return factory
+
+
 def wrap_external_exception(
     exc: Exception,
     service_name: str,
@@ -497,37 +592,39 @@ def wrap_external_exception(
     """Wrap external exceptions in PHANTOM exceptions"""
     
     # Map common exception types
-    if isinstance(exc, TimeoutError):
-        return TimeoutException(operation, 30.0, context=context, cause=exc)
-    elif isinstance(exc, ConnectionError):
-        return NetworkException(f"Connection error during {operation}", context=context, cause=exc)
-    elif "authentication" in str(exc).lower() or "unauthorized" in str(exc).lower():
+    exc_type = type(exc)
+    try:
+        factory = _resolved_wrappers[exc_type]
+    except KeyError:
+        factory = _resolve_wrapper(exc_type)
+    if factory is not None:
+        return factory(exc, service_name, operation, context)
+    
+    exc_msg = str(exc)
+    if _AUTH_PATTERN.search(exc_msg):
         return AuthenticationException(f"Authentication failed for {service_name}", context=context, cause=exc)
-    elif "permission" in str(exc).lower() or "forbidden" in str(exc).lower():
+    elif _PERMISSION_PATTERN.search(exc_msg):
         return AuthorizationException(f"Authorization failed for {service_name}", context=context, cause=exc)
     else:
-        return ExternalServiceException(service_name, str(exc), context=context, cause=exc)
+        return ExternalServiceException(service_name, exc_msg, context=context, cause=exc)
 
 
 def is_retryable_error(exc: Exception) -> bool:
     """Check if an error is retryable"""
-    retryable_categories = {
-        ErrorCategory.NETWORK,
-        ErrorCategory.EXTERNAL_SERVICE,
-        ErrorCategory.TIMEOUT,
-        ErrorCategory.RATE_LIMITING
-    }
-    
     if isinstance(exc, PhantomBaseException):
-        return exc.category in retryable_categories
+        return exc.category in _RETRYABLE_CATEGORIES
     
-    # Common retryable exception types
-    retryable_types = (
-        ConnectionError,
-        TimeoutError,
-    )
-    
-    return isinstance(exc, retryable_types)
+    return isinstance(exc, _RETRYABLE_TYPES)
+
+
+# Precomputed retry delays for the first attempts, indexed by attempt - 1
+_BACKOFF_TABLE_SIZE = 10
+_MAX_NETWORK_BACKOFF = 300
+_RATE_LIMIT_BACKOFF = tuple(60 * attempt for attempt in range(1, _BACKOFF_TABLE_SIZE + 1))
+_CIRCUIT_BREAKER_BACKOFF = tuple(30 * attempt for attempt in range(1, _BACKOFF_TABLE_SIZE + 1))
+_NETWORK_BACKOFF = tuple(
+    min(_MAX_NETWORK_BACKOFF, 5 * (2 ** attempt)) for attempt in range(1, _BACKOFF_TABLE_SIZE + 1)
+)
 
 
 def get_retry_delay(exc: Exception, attempt: int = 1) -> Optional[int]:
@@ -535,13 +632,17 @@ def get_retry_delay(exc: Exception, attempt: int = 1) -> Optional[int]:
     if isinstance(exc, PhantomBaseException) and exc.retry_after:
         return exc.retry_after
     
+    in_table = 1 <= attempt <= _BACKOFF_TABLE_SIZE
+    
     if isinstance(exc, RateLimitException):
-        return exc.retry_after or (60 * attempt)
+        return exc.retry_after or (_RATE_LIMIT_BACKOFF[attempt - 1] if in_table else 60 * attempt)
     
     if isinstance(exc, CircuitBreakerException):
-        return 30 * attempt
+        return _CIRCUIT_BREAKER_BACKOFF[attempt - 1] if in_table else 30 * attempt
     
     if isinstance(exc, NetworkException):
-        return min(300, 5 * (2 ** attempt))  # Exponential backoff, max 5 minutes
+        if in_table:
+            return _NETWORK_BACKOFF[attempt - 1]
+        return min(_MAX_NETWORK_BACKOFF, 5 * (2 ** attempt))  # Exponential backoff, max 5 minutes
     
-    return None
\ No newline at end of file
+    return None
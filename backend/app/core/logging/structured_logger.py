@@ -4,20 +4,33 @@ Structured Logging System with Correlation IDs and Centralized Management
 
 import json
 import uuid
+import math
+import os
+import sys
 import time
 import logging
 import asyncio
-from typing import Dict, Any, Optional, Union, List, Callable
+from typing import Dict, Any, Optional, Union, List, Callable, Deque
 from datetime import datetime, timedelta
 from enum import Enum
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from contextvars import ContextVar
 from functools import wraps
 import threading
+from collections import Counter, deque
 import traceback
-import inspect
+import queue
+import atexit
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
 # Context variables for correlation tracking
 correlation_id: ContextVar[Optional[str]] = ContextVar('correlation_id', default=None)
 user_id: ContextVar[Optional[str]] = ContextVar('user_id', default=None)
@@ -25,7 +38,7 @@ scan_id: ContextVar[Optional[str]] = ContextVar('scan_id', default=None)
 request_id: ContextVar[Optional[str]] = ContextVar('request_id', default=None)
 
 
-class LogLevel(Enum):
+class LogLevel(str, Enum):
     """Enhanced log levels"""
     TRACE = "TRACE"
     DEBUG = "DEBUG"
@@ -37,7 +50,24 @@ class LogLevel(Enum):
     AUDIT = "AUDIT"        # Special level for audit events
 
 
-class EventType(Enum):
+# stdlib level numbers for LogLevel; the custom levels are registered by name below
+_PY_LEVEL: Dict[LogLevel, int] = {
+    LogLevel.TRACE: 5,
+    LogLevel.DEBUG: logging.DEBUG,
+    LogLevel.INFO: logging.INFO,
+    LogLevel.AUDIT: 25,
+    LogLevel.WARNING: logging.WARNING,
+    LogLevel.SECURITY: 35,
+    LogLevel.ERROR: logging.ERROR,
+    LogLevel.CRITICAL: logging.CRITICAL
+}
+
+logging.addLevelName(_PY_LEVEL[LogLevel.TRACE], LogLevel.TRACE.value)
+logging.addLevelName(_PY_LEVEL[LogLevel.AUDIT], LogLevel.AUDIT.value)
+logging.addLevelName(_PY_LEVEL[LogLevel.SECURITY], LogLevel.SECURITY.value)
+
+
+class EventType(str, Enum):
     """Types of events for categorization"""
     API_REQUEST = "api_request"
     API_RESPONSE = "api_response"
@@ -53,7 +83,13 @@ class EventType(Enum):
     AUDIT_EVENT = "audit_event"
 
 
-@dataclass
+_CONTEXT_FIELDS = (
+    'correlation_id', 'request_id', 'user_id', 'scan_id', 'session_id',
+    'ip_address', 'user_agent', 'trace_id', 'span_id'
+)
+
+
+@dataclass(slots=True)
 class LogContext:
     """Context information for structured logging"""
     correlation_id: Optional[str] = None
@@ -68,10 +104,10 @@ class LogContext:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary, excluding None values"""
-        return {k: v for k, v in asdict(self).items() if v is not None}
+        return {k: v for k in _CONTEXT_FIELDS if (v := getattr(self, k)) is not None}
 
 
-@dataclass
+@dataclass(slots=True)
 class LogEvent:
     """Structured log event"""
     timestamp: datetime
@@ -88,9 +124,9 @@ class LogEvent:
         """Convert to dictionary for serialization"""
         result = {
             "timestamp": self.timestamp.isoformat(),
-            "level": self.level.value,
+            "level": self.level,
             "message": self.message,
-            "event_type": self.event_type.value,
+            "event_type": self.event_type,
             "context": self.context.to_dict(),
             "metadata": self.metadata,
             "tags": self.tags
@@ -106,7 +142,18 @@ class LogEvent:
     
     def to_json(self) -> str:
         """Convert to JSON string"""
-        return json.dumps(self.to_dict(), default=str)
+        return _dumps(self.to_dict())
+
+
+def _dumps(data: Dict[str, Any]) -> str:
+    """Serialize a log payload to JSON, preferring orjson"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            # e.g. integers beyond 64 bits; the stdlib encoder handles these
+            pass
+    return json.dumps(data, default=str)
 
 
 class StructuredFormatter(logging.Formatter):
@@ -114,103 +161,318 @@ class StructuredFormatter(logging.Formatter):
     
     def format(self, record: logging.LogRecord) -> str:
         """Format log record as structured JSON"""
-        # Extract context from context variables
-        context = LogContext(
-            correlation_id=correlation_id.get(),
-            request_id=request_id.get(),
-            user_id=user_id.get(),
-            scan_id=scan_id.get()
-        )
+        # Context captured on the logging thread by the queue handler, if any
+        context = getattr(record, 'log_context', None)
+        if context is None:
+            context = _capture_context()
         
-        # Create log event
-        event = LogEvent(
-            timestamp=datetime.fromtimestamp(record.created),
-            level=LogLevel(record.levelname),
-            message=record.getMessage(),
-            event_type=getattr(record, 'event_type', EventType.SYSTEM_EVENT),
-            context=context,
-            metadata=getattr(record, 'metadata', {}),
-            error_details=self._extract_error_details(record),
-            performance_metrics=getattr(record, 'performance_metrics', None),
-            tags=getattr(record, 'tags', [])
-        )
+        result = {
+            "timestamp": _format_timestamp(record.created),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "event_type": getattr(record, 'event_type', EventType.SYSTEM_EVENT),
+            "context": context,
+            "metadata": getattr(record, 'metadata', {}),
+            "tags": getattr(record, 'tags', [])
+        }
         
-        return event.to_json()
+        error_details = self._extract_error_details(record)
+        if error_details:
+            result["error"] = error_details
+        
+        performance_metrics = getattr(record, 'performance_metrics', None)
+        if performance_metrics:
+            result["performance"] = performance_metrics
+        
+        return _dumps(result)
     
     def _extract_error_details(self, record: logging.LogRecord) -> Optional[Dict[str, Any]]:
         """Extract error details from log record"""
         if record.exc_info:
+            exc_type, exc_value, tb = record.exc_info
+            module = function = line_number = None
+            if tb is not None:
+                # Report where the exception was raised
+                while tb.tb_next is not None:
+                    tb = tb.tb_next
+                code = tb.tb_frame.f_code
+                module = Path(code.co_filename).stem
+                function = code.co_name
+                line_number = tb.tb_lineno
             return {
-                "exception_type": record.exc_info[0].__name__ if record.exc_info[0] else None,
-                "exception_message": str(record.exc_info[1]) if record.exc_info[1] else None,
-                "traceback": traceback.format_exception(*record.exc_info),
-                "module": record.module,
-                "function": record.funcName,
-                "line_number": record.lineno
+                "exception_type": exc_type.__name__ if exc_type else None,
+                "exception_message": str(exc_value) if exc_value else None,
+                # Full stacks only for error records; lower levels keep type and message
+                "traceback": _format_exception(*record.exc_info) if record.levelno >= logging.ERROR else None,
+                "module": module,
+                "function": function,
+                "line_number": line_number
             }
         return None
 
 
+# Records arrive in time order, so the formatted whole-second prefix is reused across a burst
+_timestamp_prefix = (None, "")
+
+
+def _format_timestamp(created: float) -> str:
+    """Local ISO 8601 timestamp, equivalent to datetime.fromtimestamp(created).isoformat()"""
+    global _timestamp_prefix
+    seconds = math.floor(created)
+    micros = round((created - seconds) * 1e6)
+    if micros == 1000000:
+        seconds += 1
+        micros = 0
+    cached_seconds, prefix = _timestamp_prefix
+    if cached_seconds != seconds:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(seconds))
+        _timestamp_prefix = (seconds, prefix)
+    return f"{prefix}.{micros:06d}" if micros else prefix
+
+
+# Formatted stacks keyed by (code, instruction) per frame; repeated failures reuse them
+_TRACEBACK_CACHE_SIZE = 256
+_traceback_cache: Dict[tuple, List[str]] = {}
+
+
+def _format_exception(exc_type, exc_value, tb) -> List[str]:
+    """Equivalent of traceback.format_exception that reuses formatted stacks"""
+    if (
+        tb is None
+        or exc_value is None
+        or exc_value.__cause__ is not None
+        or (exc_value.__context__ is not None and not exc_value.__suppress_context__)
+        or isinstance(exc_value, BaseExceptionGroup)
+    ):
+        return traceback.format_exception(exc_type, exc_value, tb)
+    
+    key = tuple((frame.f_code, tb_lasti) for frame, tb_lasti in _walk_tb_lasti(tb))
+    stack = _traceback_cache.get(key)
+    if stack is None:
+        if len(_traceback_cache) >= _TRACEBACK_CACHE_SIZE:
+            _traceback_cache.clear()
+        stack = traceback.extract_tb(tb).format()
+        _traceback_cache[key] = stack
+    return ["Traceback (most recent call last):\n", *stack, *traceback.format_exception_only(exc_type, exc_value)]
+
+
+def _walk_tb_lasti(tb):
+    """Yield (frame, last instruction) for each traceback entry"""
+    while tb is not None:
+        yield tb.tb_frame, tb.tb_lasti
+        tb = tb.tb_next
+
+
+_CONTEXT_VARS = (
+    ('correlation_id', correlation_id),
+    ('request_id', request_id),
+    ('user_id', user_id),
+    ('scan_id', scan_id)
+)
+
+
+def _capture_context() -> Dict[str, str]:
+    """Snapshot the correlation context variables that are set"""
+    return {name: value for name, var in _CONTEXT_VARS if (value := var.get()) is not None}
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Queue handler that leaves formatting to the listener thread"""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Capture context variables, which the listener thread cannot see"""
+        record.log_context = _capture_context()
+        return record
+
+
+class _FlushRequest:
+    """Queue marker acknowledged once every record queued before it is handled"""
+    __slots__ = ('done',)
+    
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class BufferedStreamHandler(logging.StreamHandler):
+    """Stream handler that coalesces records and writes them in batches"""
+    
+    def __init__(self, stream=None, buffer_size: int = 8192):
+        super().__init__(stream)
+        self.buffer_size = buffer_size
+        self._pending: List[str] = []
+        self._pending_size = 0
+    
+    def emit(self, record: logging.LogRecord):
+        """Buffer the formatted record, writing once the buffer is full"""
+        try:
+            msg = self.format(record) + self.terminator
+        except Exception:
+            self.handleError(record)
+            return
+        self._pending.append(msg)
+        self._pending_size += len(msg)
+        if self._pending_size >= self.buffer_size:
+            self.flush()
+    
+    def flush(self):
+        """Write buffered records in a single call and flush the stream"""
+        self.acquire()
+        try:
+            if self._pending:
+                data = "".join(self._pending)
+                self._pending.clear()
+                self._pending_size = 0
+                try:
+                    self.stream.write(data)
+                except Exception:
+                    if logging.raiseExceptions:
+                        traceback.print_exc()
+            super().flush()
+        finally:
+            self.release()
+
+
+class StructuredQueueListener(QueueListener):
+    """Queue listener that also acknowledges flush requests"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.running = False
+    
+    def start(self):
+        super().start()
+        self.running = True
+    
+    def stop(self):
+        self.running = False
+        super().stop()
+        self.flush_handlers()
+    
+    def flush_handlers(self):
+        """Flush every handler, writing out buffered records"""
+        for handler in self.handlers:
+            handler.flush()
+    
+    def handle(self, record):
+        """Handle a record, or release a caller waiting on a flush"""
+        if isinstance(record, _FlushRequest):
+            self.flush_handlers()
+            record.done.set()
+            return
+        super().handle(record)
+        # Write the batch out as soon as the queue runs dry
+        if self.queue.empty():
+            self.flush_handlers()
+
+
+# Single background sink shared by all structured loggers
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_queue_handler: Optional[DeferredQueueHandler] = None
+_queue_listener: Optional[StructuredQueueListener] = None
+_queue_lock = threading.Lock()
+
+
+def get_queue_handler() -> DeferredQueueHandler:
+    """Get the shared queue handler, starting its listener thread on first use"""
+    global _queue_handler, _queue_listener
+    if _queue_handler is None:
+        with _queue_lock:
+            if _queue_handler is None:
+                stream_handler = BufferedStreamHandler()
+                stream_handler.setFormatter(StructuredFormatter())
+                _queue_listener = StructuredQueueListener(_log_queue, stream_handler, respect_handler_level=True)
+                _queue_listener.start()
+                # Flush queued records on interpreter exit
+                atexit.register(_queue_listener.stop)
+                _queue_handler = DeferredQueueHandler(_log_queue)
+    return _queue_handler
+
+
+def flush_logs(timeout: float = 1.0) -> bool:
+    """Block until records queued so far have been written by the listener thread"""
+    if _queue_listener is None or not _queue_listener.running:
+        return True
+    request = _FlushRequest()
+    _log_queue.put_nowait(request)
+    return request.done.wait(timeout)
+
+
 class MetricsCollector:
     """Collects and aggregates logging metrics"""
     
+    RESPONSE_TIME_WINDOW = 1000
+    
     def __init__(self):
-        self.metrics: Dict[str, Any] = {
-            "total_logs": 0,
-            "logs_by_level": {},
-            "logs_by_event_type": {},
-            "errors_count": 0,
-            "warnings_count": 0,
-            "average_response_time": 0.0,
-            "last_reset": datetime.utcnow()
-        }
         self.lock = threading.Lock()
-        self.response_times: List[float] = []
+        self._reset_state()
+    
+    def _reset_state(self):
+        """Initialise counters; callers hold the lock or own the instance"""
+        self.total_logs = 0
+        self.logs_by_level: Counter = Counter()
+        self.logs_by_event_type: Counter = Counter()
+        self.errors_count = 0
+        self.warnings_count = 0
+        # Recent response times with a running sum, so averaging is O(1) per record
+        self.response_times: Deque[float] = deque(maxlen=self.RESPONSE_TIME_WINDOW)
+        self._response_time_sum = 0.0
+        self._response_time_updates = 0
+        self.last_reset = datetime.utcnow()
         
     def record_log(self, level: LogLevel, event_type: EventType, response_time: Optional[float] = None):
         """Record a log event for metrics"""
+        level_key = level.value
+        event_key = event_type.value
         with self.lock:
-            self.metrics["total_logs"] += 1
-            
-            # Count by level
-            level_key = level.value
-            self.metrics["logs_by_level"][level_key] = self.metrics["logs_by_level"].get(level_key, 0) + 1
-            
-            # Count by event type
-            event_key = event_type.value
-            self.metrics["logs_by_event_type"][event_key] = self.metrics["logs_by_event_type"].get(event_key, 0) + 1
+            self.total_logs += 1
+            self.logs_by_level[level_key] += 1
+            self.logs_by_event_type[event_key] += 1
             
             # Special counters
-            if level in [LogLevel.ERROR, LogLevel.CRITICAL]:
-                self.metrics["errors_count"] += 1
-            elif level == LogLevel.WARNING:
-                self.metrics["warnings_count"] += 1
+            if level is LogLevel.ERROR or level is LogLevel.CRITICAL:
+                self.errors_count += 1
+            elif level is LogLevel.WARNING:
+                self.warnings_count += 1
             
-            # Response time tracking
+            # Response time tracking over the most recent window
             if response_time is not None:
-                self.response_times.append(response_time)
-                # Keep only recent response times (last 1000)
-                self.response_times = self.response_times[-1000:]
-                self.metrics["average_response_time"] = sum(self.response_times) / len(self.response_times)
+                response_times = self.response_times
+                if len(response_times) == response_times.maxlen:
+                    self._response_time_sum -= response_times[0]
+                response_times.append(response_time)
+                self._response_time_sum += response_time
+                
+                # Re-derive the sum once per window so subtraction error cannot accumulate
+                self._response_time_updates += 1
+                if self._response_time_updates >= self.RESPONSE_TIME_WINDOW:
+                    self._response_time_updates = 0
+                    self._response_time_sum = math.fsum(response_times)
     
     def get_metrics(self) -> Dict[str, Any]:
         """Get current metrics"""
         with self.lock:
-            return self.metrics.copy()
+            count = len(self.response_times)
+            return {
+                "total_logs": self.total_logs,
+                "logs_by_level": dict(self.logs_by_level),
+                "logs_by_event_type": dict(self.logs_by_event_type),
+                "errors_count": self.errors_count,
+                "warnings_count": self.warnings_count,
+                "average_response_time": self._response_time_sum / count if count else 0.0,
+                "last_reset": self.last_reset
+            }
     
     def reset_metrics(self):
         """Reset metrics counters"""
         with self.lock:
-            self.metrics = {
-                "total_logs": 0,
-                "logs_by_level": {},
-                "logs_by_event_type": {},
-                "errors_count": 0,
-                "warnings_count": 0,
-                "average_response_time": 0.0,
-                "last_reset": datetime.utcnow()
-            }
-            self.response_times.clear()
+            self._reset_state()
+
+
+def _merge_metadata(metadata: Optional[Dict[str, Any]], fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Combine caller metadata with event fields without mutating the caller's dict"""
+    if not metadata:
+        return fields
+    return {**metadata, **fields}
 
 
 class StructuredLogger:
@@ -219,13 +481,11 @@ class StructuredLogger:
     def __init__(self, name: str, level: LogLevel = LogLevel.INFO):
         self.name = name
         self.logger = logging.getLogger(name)
-        self.logger.setLevel(getattr(logging, level.value))
+        self.logger.setLevel(_PY_LEVEL[level])
         self.metrics_collector = MetricsCollector()
         
-        # Setup structured formatter
-        handler = logging.StreamHandler()
-        handler.setFormatter(StructuredFormatter())
-        self.logger.addHandler(handler)
+        # Records are queued here and formatted/written by the shared listener thread
+        self.logger.addHandler(get_queue_handler())
     
     def _log(self, 
              level: LogLevel,
@@ -237,6 +497,11 @@ class StructuredLogger:
              tags: Optional[List[str]] = None,
              **kwargs):
         """Internal logging method"""
+        log_level = _PY_LEVEL[level]
+        
+        # Disabled levels cost nothing beyond this check
+        if not self.logger.isEnabledFor(log_level):
+            return
         
         # Record metrics
         response_time = performance_metrics.get('response_time_ms') if performance_metrics else None
@@ -249,15 +514,31 @@ class StructuredLogger:
             'performance_metrics': performance_metrics,
             'tags': tags or []
         }
-        extra.update(kwargs)
+        if kwargs:
+            extra.update(kwargs)
+        exc_info = None
+        if error is not None:
+            exc_info = (type(error), error, error.__traceback__)
+            if error.__traceback__ is None:
+                # Wrapped errors are never raised; report the exception being handled instead
+                handled = sys.exc_info()
+                if handled[0] is not None:
+                    exc_info = handled
         
-        # Log with appropriate level
-        log_level = getattr(logging, level.value)
+        # Build and dispatch the record directly; Logger.log would also walk the stack
+        # in findCaller, only to report this method as the caller
+        record = self.logger.makeRecord(
+            self.logger.name, log_level, "(unknown file)", 0, message, None, exc_info, extra=extra
+        )
+        self.logger.handle(record)
         
-        if error:
-            self.logger.log(log_level, message, exc_info=True, extra=extra)
-        else:
-            self.logger.log(log_level, message, extra=extra)
+        # Critical records are written before returning, in case the process is going down
+        if level == LogLevel.CRITICAL:
+            flush_logs()
+    
+    def isEnabledFor(self, level: int) -> bool:
+        """Check if a stdlib logging level would be emitted by this logger"""
+        return self.logger.isEnabledFor(level)
     
     def trace(self, message: str, **kwargs):
         """Log trace message"""
@@ -293,22 +574,14 @@ class StructuredLogger:
     
     def api_request(self, method: str, path: str, **kwargs):
         """Log API request"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         message = f"{method} {path}"
-        metadata = kwargs.pop('metadata', {})
-        metadata.update({"method": method, "path": path})
+        metadata = _merge_metadata(kwargs.pop('metadata', None), {"method": method, "path": path})
         self._log(LogLevel.INFO, message, EventType.API_REQUEST, metadata=metadata, **kwargs)
     
     def api_response(self, method: str, path: str, status_code: int, response_time_ms: float, **kwargs):
         """Log API response"""
-        message = f"{method} {path} -> {status_code}"
-        metadata = kwargs.pop('metadata', {})
-        metadata.update({
-            "method": method, 
-            "path": path, 
-            "status_code": status_code
-        })
-        performance_metrics = {"response_time_ms": response_time_ms}
-        
         # Determine log level based on status code
         if status_code >= 500:
             level = LogLevel.ERROR
@@ -316,33 +589,45 @@ class StructuredLogger:
             level = LogLevel.WARNING
         else:
             level = LogLevel.INFO
-            
+        if not self.logger.isEnabledFor(_PY_LEVEL[level]):
+            return
+        
+        message = f"{method} {path} -> {status_code}"
+        metadata = _merge_metadata(kwargs.pop('metadata', None), {
+            "method": method, 
+            "path": path, 
+            "status_code": status_code
+        })
+        performance_metrics = {"response_time_ms": response_time_ms}
+        
         self._log(level, message, EventType.API_RESPONSE, 
                  metadata=metadata, performance_metrics=performance_metrics, **kwargs)
     
     def database_query(self, query_type: str, table: str, duration_ms: float, **kwargs):
         """Log database query"""
+        level = LogLevel.WARNING if duration_ms > 1000 else LogLevel.DEBUG
+        if level is LogLevel.DEBUG and not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        
         message = f"Database {query_type} on {table}"
-        metadata = kwargs.pop('metadata', {})
-        metadata.update({"query_type": query_type, "table": table})
+        metadata = _merge_metadata(kwargs.pop('metadata', None), {"query_type": query_type, "table": table})
         performance_metrics = {"query_time_ms": duration_ms}
         
-        level = LogLevel.WARNING if duration_ms > 1000 else LogLevel.DEBUG
         self._log(level, message, EventType.DATABASE_QUERY,
                  metadata=metadata, performance_metrics=performance_metrics, **kwargs)
     
     def vulnerability_found(self, vulnerability: Dict[str, Any], **kwargs):
         """Log vulnerability discovery"""
         severity = vulnerability.get('severity', 'unknown')
+        severity_lower = severity.lower()
+        level = LogLevel.CRITICAL if severity_lower == 'critical' else LogLevel.WARNING
+        if not self.logger.isEnabledFor(_PY_LEVEL[level]):
+            return
+        
         target = vulnerability.get('target', 'unknown')
         message = f"Vulnerability found: {severity} on {target}"
-        
-        metadata = kwargs.pop('metadata', {})
-        metadata.update(vulnerability)
-        
-        level = LogLevel.CRITICAL if severity.lower() == 'critical' else LogLevel.WARNING
-        tags = kwargs.pop('tags', [])
-        tags.extend(['vulnerability', severity.lower()])
+        metadata = {**(kwargs.pop('metadata', None) or {}), **vulnerability}
+        tags = [*kwargs.pop('tags', ()), 'vulnerability', severity_lower]
         
         self._log(level, message, EventType.VULNERABILITY_FOUND,
                  metadata=metadata, tags=tags, **kwargs)
@@ -350,19 +635,19 @@ class StructuredLogger:
     def external_service_call(self, service: str, operation: str, 
                             duration_ms: float, success: bool = True, **kwargs):
         """Log external service call"""
+        level = LogLevel.ERROR if not success else LogLevel.INFO
+        if not self.logger.isEnabledFor(_PY_LEVEL[level]):
+            return
+        
         status = "successful" if success else "failed"
         message = f"External service call to {service}.{operation} {status}"
-        
-        metadata = kwargs.pop('metadata', {})
-        metadata.update({
+        metadata = _merge_metadata(kwargs.pop('metadata', None), {
             "service": service,
             "operation": operation,
             "success": success
         })
-        
         performance_metrics = {"call_duration_ms": duration_ms}
         
-        level = LogLevel.ERROR if not success else LogLevel.INFO
         self._log(level, message, EventType.EXTERNAL_SERVICE,
                  metadata=metadata, performance_metrics=performance_metrics, **kwargs)
     
@@ -377,12 +662,21 @@ class LoggerManager:
     def __init__(self):
         self.loggers: Dict[str, StructuredLogger] = {}
         self.default_level = LogLevel.INFO
+        self._lock = threading.Lock()
     
     def get_logger(self, name: str, level: Optional[LogLevel] = None) -> StructuredLogger:
         """Get or create a structured logger"""
-        if name not in self.loggers:
-            self.loggers[name] = StructuredLogger(name, level or self.default_level)
-        return self.loggers[name]
+        structured_logger = self.loggers.get(name)
+        if structured_logger is not None:
+            return structured_logger
+        
+        # Creation attaches a handler to the stdlib logger, so it must happen once per name
+        with self._lock:
+            structured_logger = self.loggers.get(name)
+            if structured_logger is None:
+                structured_logger = StructuredLogger(name, level or self.default_level)
+                self.loggers[name] = structured_logger
+            return structured_logger
     
     def set_default_level(self, level: LogLevel):
         """Set default logging level for new loggers"""
@@ -423,7 +717,12 @@ def set_request_id(request_id_value: str):
 
 
 def generate_correlation_id() -> str:
-    """Generate a new correlation ID"""
+    """Generate a new correlation ID (128 random bits as 32 hex characters)"""
+    return os.urandom(16).hex()
+
+
+def generate_uuid_correlation_id() -> str:
+    """Generate a new correlation ID in RFC 4122 UUID form"""
     return str(uuid.uuid4())
 
 
@@ -432,58 +731,58 @@ def with_correlation_id(correlation_id_value: Optional[str] = None):
     def decorator(func):
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
-            cid = correlation_id_value or generate_correlation_id()
-            correlation_id.set(cid)
+            token = correlation_id.set(correlation_id_value or generate_correlation_id())
             try:
                 return await func(*args, **kwargs)
             finally:
-                correlation_id.set(None)
+                correlation_id.reset(token)
         
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
-            cid = correlation_id_value or generate_correlation_id()
-            correlation_id.set(cid)
+            token = correlation_id.set(correlation_id_value or generate_correlation_id())
             try:
                 return func(*args, **kwargs)
             finally:
-                correlation_id.set(None)
+                correlation_id.reset(token)
         
         return async_wrapper if asyncio.iscoroutinefunction(func) else sync_wrapper
     return decorator
 
 
+def _enter_scan_context(scan_id_value: str, user_id_value: Optional[str]) -> List[tuple]:
+    """Set scan context variables, returning the tokens needed to restore them"""
+    tokens = [(scan_id, scan_id.set(scan_id_value))]
+    if user_id_value:
+        tokens.append((user_id, user_id.set(user_id_value)))
+    if not correlation_id.get():
+        tokens.append((correlation_id, correlation_id.set(generate_correlation_id())))
+    return tokens
+
+
+def _exit_context(tokens: List[tuple]):
+    """Restore context variables in reverse order of setting"""
+    for var, token in reversed(tokens):
+        var.reset(token)
+
+
 def with_scan_context(scan_id_value: str, user_id_value: Optional[str] = None):
     """Decorator to set scan context for function execution"""
     def decorator(func):
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
-            scan_id.set(scan_id_value)
-            if user_id_value:
-                user_id.set(user_id_value)
-            if not correlation_id.get():
-                correlation_id.set(generate_correlation_id())
-            
+            tokens = _enter_scan_context(scan_id_value, user_id_value)
             try:
                 return await func(*args, **kwargs)
             finally:
-                scan_id.set(None)
-                if user_id_value:
-                    user_id.set(None)
+                _exit_context(tokens)
         
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
-            scan_id.set(scan_id_value)
-            if user_id_value:
-                user_id.set(user_id_value)
-            if not correlation_id.get():
-                correlation_id.set(generate_correlation_id())
-            
+            tokens = _enter_scan_context(scan_id_value, user_id_value)
             try:
                 return func(*args, **kwargs)
             finally:
-                scan_id.set(None)
-                if user_id_value:
-                    user_id.set(None)
+                _exit_context(tokens)
         
         return async_wrapper if asyncio.iscoroutinefunction(func) else sync_wrapper
     return decorator
@@ -492,17 +791,20 @@ def with_scan_context(scan_id_value: str, user_id_value: Optional[str] = None):
 def log_performance(operation_name: str, logger: Optional[StructuredLogger] = None):
     """Decorator to log function performance"""
     def decorator(func):
+        log = logger or get_logger(func.__module__)
+        completed_message = f"Operation '{operation_name}' completed"
+        failed_message = f"Operation '{operation_name}' failed"
+        
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
-            log = logger or get_logger(func.__module__)
-            start_time = time.time()
+            start_time = time.perf_counter()
             
             try:
                 result = await func(*args, **kwargs)
-                duration_ms = (time.time() - start_time) * 1000
+                duration_ms = (time.perf_counter() - start_time) * 1000
                 
                 log.info(
-                    f"Operation '{operation_name}' completed",
+                    completed_message,
                     event_type=EventType.PERFORMANCE_METRIC,
                     performance_metrics={"duration_ms": duration_ms},
                     metadata={"function": func.__name__, "module": func.__module__}
@@ -510,10 +812,10 @@ def log_performance(operation_name: str, logger: Optional[StructuredLogger] = No
                 
                 return result
             except Exception as e:
-                duration_ms = (time.time() - start_time) * 1000
+                duration_ms = (time.perf_counter() - start_time) * 1000
                 
                 log.error(
-                    f"Operation '{operation_name}' failed",
+                    failed_message,
                     error=e,
                     event_type=EventType.ERROR_OCCURRED,
                     performance_metrics={"duration_ms": duration_ms},
@@ -523,15 +825,14 @@ def log_performance(operation_name: str, logger: Optional[StructuredLogger] = No
         
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
-            log = logger or get_logger(func.__module__)
-            start_time = time.time()
+            start_time = time.perf_counter()
             
             try:
                 result = func(*args, **kwargs)
-                duration_ms = (time.time() - start_time) * 1000
+                duration_ms = (time.perf_counter() - start_time) * 1000
                 
                 log.info(
-                    f"Operation '{operation_name}' completed",
+                    completed_message,
                     event_type=EventType.PERFORMANCE_METRIC,
                     performance_metrics={"duration_ms": duration_ms},
                     metadata={"function": func.__name__, "module": func.__module__}
@@ -539,10 +840,10 @@ def log_performance(operation_name: str, logger: Optional[StructuredLogger] = No
                 
                 return result
             except Exception as e:
-                duration_ms = (time.time() - start_time) * 1000
+                duration_ms = (time.perf_counter() - start_time) * 1000
                 
                 log.error(
-                    f"Operation '{operation_name}' failed",
+                    failed_message,
                     error=e,
                     event_type=EventType.ERROR_OCCURRED,
                     performance_metrics={"duration_ms": duration_ms},
@@ -551,4 +852,4 @@ def log_performance(operation_name: str, logger: Optional[StructuredLogger] = No
                 raise
         
         return async_wrapper if asyncio.iscoroutinefunction(func) else sync_wrapper
-    return decorator
\ No newline at end of file
+    return decorator
@@ -2,8 +2,9 @@
 Scan profiles for different use cases and scenarios
 """
 
-from dataclasses import dataclass, field
-from typing import Dict, List, Any, Optional, Set
+from dataclasses import dataclass, field, fields, replace
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Any, Mapping, Optional, Set, Tuple
 from enum import Enum
 import logging
 
@@ -30,7 +31,28 @@ class PhaseType(Enum):
     EXPLOIT_GENERATION = "exploit_generation"
 
 
-@dataclass
+class _ReadOnlyDict(dict):
+    """Dict that rejects mutation, so shared profile data cannot be changed in place"""
+    
+    __slots__ = ()
+    
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(f"'{type(self).__name__}' object is read-only")
+    
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+    
+    def __reduce__(self):
+        # Rebuild from a plain dict, since item assignment is blocked
+        return (type(self), (dict(self),))
+
+
+# Shared by every phase without parameters or dependencies of its own
+_EMPTY_PARAMETERS: Mapping[str, Any] = _ReadOnlyDict()
+_EMPTY_DEPENDENCIES: FrozenSet[PhaseType] = frozenset()
+
+
+@dataclass(frozen=True, slots=True)
 class PhaseConfig:
     """Configuration for a specific scan phase"""
     enabled: bool = True
@@ -39,23 +61,48 @@ class PhaseConfig:
     parallel_execution: bool = True
     priority: int = 1  # 1 = highest priority
     
-    # Phase-specific parameters
-    parameters: Dict[str, Any] = field(default_factory=dict)
+    # Phase-specific parameters, frozen read-only on construction
+    parameters: Mapping[str, Any] = field(default_factory=lambda: _EMPTY_PARAMETERS)
     
     # Dependencies - phases that must complete first
-    dependencies: Set[PhaseType] = field(default_factory=set)
+    dependencies: FrozenSet[PhaseType] = field(default_factory=lambda: _EMPTY_DEPENDENCIES)
+    
+    def __post_init__(self):
+        if not self.parameters:
+            object.__setattr__(self, "parameters", _EMPTY_PARAMETERS)
+        elif not isinstance(self.parameters, _ReadOnlyDict):
+            object.__setattr__(self, "parameters", _ReadOnlyDict(self.parameters))
+        if not self.dependencies:
+            object.__setattr__(self, "dependencies", _EMPTY_DEPENDENCIES)
+        elif not isinstance(self.dependencies, frozenset):
+            object.__setattr__(self, "dependencies", frozenset(self.dependencies))
+    
+    # Parameters may hold lists, so phases compare by value but are not hashable
+    __hash__ = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert phase configuration to dictionary"""
+        return {
+            "enabled": self.enabled,
+            "timeout_seconds": self.timeout_seconds,
+            "max_retries": self.max_retries,
+            "parallel_execution": self.parallel_execution,
+            "priority": self.priority,
+            "parameters": dict(self.parameters),
+            "dependencies": sorted(dep.value for dep in self.dependencies)
+        }
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ScanProfile:
-    """Complete scan profile definition"""
+    """Complete scan profile definition, immutable so profiles can be shared"""
     name: str
     description: str
     scan_type: ScanType
     estimated_duration_minutes: int
     
-    # Phase configurations
-    phases: Dict[PhaseType, PhaseConfig] = field(default_factory=dict)
+    # Phase configurations, frozen read-only on construction
+    phases: Mapping[PhaseType, PhaseConfig] = field(default_factory=dict)
     
     # Global settings
     max_concurrent_phases: int = 3
@@ -72,476 +119,630 @@ class ScanProfile:
     generate_report: bool = True
     include_exploits: bool = False
     detailed_logging: bool = False
+    
+    # Derived phase data, computed on first access
+    _execution_plan: Optional[List[List[PhaseType]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _enabled_phases: Optional[Tuple[PhaseType, ...]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _total_enabled_timeout: int = field(default=0, init=False, repr=False, compare=False)
+    
+    # Not hashable, like the phases it holds
+    __hash__ = None
+    
+    def __post_init__(self):
+        if not isinstance(self.phases, _ReadOnlyDict):
+            object.__setattr__(self, "phases", _ReadOnlyDict(self.phases))
+    
+    @property
+    def execution_plan(self) -> List[List[PhaseType]]:
+        """Enabled phases grouped into layers that can run once earlier layers finish"""
+        if self._execution_plan is None:
+            object.__setattr__(self, "_execution_plan", _build_execution_plan(self.phases))
+        return self._execution_plan
+    
+    @property
+    def enabled_phases(self) -> Tuple[PhaseType, ...]:
+        """Enabled phases in definition order"""
+        if self._enabled_phases is None:
+            self._collect_enabled_phases()
+        return self._enabled_phases
+    
+    @property
+    def total_enabled_timeout(self) -> int:
+        """Sum of the timeouts of all enabled phases in seconds"""
+        if self._enabled_phases is None:
+            self._collect_enabled_phases()
+        return self._total_enabled_timeout
+    
+    def _collect_enabled_phases(self):
+        """Cache the enabled phases and their total timeout"""
+        enabled_phases = []
+        total_timeout = 0
+        for phase_type, config in self.phases.items():
+            if config.enabled:
+                enabled_phases.append(phase_type)
+                total_timeout += config.timeout_seconds
+        object.__setattr__(self, "_total_enabled_timeout", total_timeout)
+        object.__setattr__(self, "_enabled_phases", tuple(enabled_phases))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert profile to dictionary"""
+        return {
+            "name": self.name,
+            "description": self.description,
+            "scan_type": self.scan_type.value,
+            "estimated_duration_minutes": self.estimated_duration_minutes,
+            "phases": {phase_type.value: config.to_dict() for phase_type, config in self.phases.items()},
+            "max_concurrent_phases": self.max_concurrent_phases,
+            "overall_timeout_minutes": self.overall_timeout_minutes,
+            "enable_caching": self.enable_caching,
+            "enable_ai_analysis": self.enable_ai_analysis,
+            "cpu_intensive_limit": self.cpu_intensive_limit,
+            "network_request_limit": self.network_request_limit,
+            "memory_limit_mb": self.memory_limit_mb,
+            "generate_report": self.generate_report,
+            "include_exploits": self.include_exploits,
+            "detailed_logging": self.detailed_logging
+        }
+
+
+# Attributes create_custom_profile accepts as modifications
+_SCAN_PROFILE_FIELDS = frozenset(f.name for f in fields(ScanProfile) if f.init)
+
+
+def _build_execution_plan(phases: Mapping[PhaseType, PhaseConfig]) -> List[List[PhaseType]]:
+    """Layer enabled phases with Kahn's algorithm, ignoring dependencies on disabled phases"""
+    in_degree = {phase_type: 0 for phase_type, config in phases.items() if config.enabled}
+    dependents: Dict[PhaseType, List[PhaseType]] = {phase_type: [] for phase_type in in_degree}
+    
+    for phase_type in in_degree:
+        for dep in phases[phase_type].dependencies:
+            if dep in in_degree:
+                in_degree[phase_type] += 1
+                dependents[dep].append(phase_type)
+    
+    layers = []
+    ready = [phase_type for phase_type, degree in in_degree.items() if degree == 0]
+    while ready:
+        ready.sort(key=lambda phase_type: phases[phase_type].priority)
+        layers.append(ready)
+        next_ready = []
+        for phase_type in ready:
+            for dependent in dependents[phase_type]:
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    next_ready.append(dependent)
+        ready = next_ready
+    
+    if sum(len(layer) for layer in layers) != len(in_degree):
+        raise ValueError("Phase dependencies contain a cycle")
+    
+    return layers
+
+
+def _find_cycle_phases(phases: Mapping[PhaseType, PhaseConfig], enabled: Set[PhaseType]) -> List[PhaseType]:
+    """Find enabled phases that close a dependency cycle, using an iterative colouring DFS"""
+    # Self dependencies are reported separately by the validator
+    visiting, done = set(), set()
+    cycle_phases = []
+    
+    for root in phases:
+        if root not in enabled or root in done:
+            continue
+        visiting.add(root)
+        stack = [(root, iter(phases[root].dependencies & enabled))]
+        while stack:
+            phase_type, deps = stack[-1]
+            for dep in deps:
+                if dep in visiting:
+                    if dep is not phase_type:
+                        cycle_phases.append(dep)
+                elif dep not in done:
+                    visiting.add(dep)
+                    stack.append((dep, iter(phases[dep].dependencies & enabled)))
+                    break
+            else:
+                stack.pop()
+                visiting.discard(phase_type)
+                done.add(phase_type)
+    
+    return cycle_phases
+
+
+def _clone_phase(phase: PhaseConfig, overrides: Dict[str, Any]) -> PhaseConfig:
+    """Copy a phase with overrides applied, without sharing its containers"""
+    changes = dict(overrides)
+    changes["parameters"] = {**phase.parameters, **overrides.get("parameters", {})}
+    changes["dependencies"] = frozenset(overrides.get("dependencies", phase.dependencies))
+    return replace(phase, **changes)
+
+
+def _build_default_profiles() -> Dict[ScanType, ScanProfile]:
+    """Build the default scan profiles"""
+    
+    # QUICK Profile - Fast reconnaissance and basic checks
+    quick_profile = ScanProfile(
+        name="Quick Scan",
+        description="Fast reconnaissance and basic vulnerability checks",
+        scan_type=ScanType.QUICK,
+        estimated_duration_minutes=5,
+        max_concurrent_phases=2,
+        overall_timeout_minutes=10,
+        enable_caching=True,
+        enable_ai_analysis=False,  # Skip AI for speed
+        cpu_intensive_limit=1,
+        network_request_limit=50,
+        memory_limit_mb=256,
+        include_exploits=False,
+        phases={
+            PhaseType.RECONNAISSANCE: PhaseConfig(
+                enabled=True,
+                timeout_seconds=60,
+                max_retries=1,
+                priority=1,
+                parameters={
+                    "dns_enumeration": True,
+                    "subdomain_discovery": False,  # Skip for speed
+                    "certificate_transparency": False,
+                    "whois_lookup": False,
+                    "max_subdomains": 5
+                }
+            ),
+            PhaseType.PORT_SCAN: PhaseConfig(
+                enabled=True,
+                timeout_seconds=120,
+                max_retries=1,
+                priority=2,
+                dependencies={PhaseType.RECONNAISSANCE},
+                parameters={
+                    "port_range": "1-1000",  # Limited range
+                    "scan_type": "syn",
+                    "timing": "aggressive",
+                    "service_detection": False
+                }
+            ),
+            PhaseType.WEB_SCAN: PhaseConfig(
+                enabled=True,
+                timeout_seconds=90,
+                max_retries=1,
+                priority=3,
+                dependencies={PhaseType.PORT_SCAN},
+                parameters={
+                    "check_ssl": True,
+                    "check_headers": True,
+                    "directory_bruteforce": False,
+                    "technology_detection": True,
+                    "max_paths": 10
+                }
+            ),
+            PhaseType.VULNERABILITY_SCAN: PhaseConfig(
+                enabled=True,
+                timeout_seconds=180,
+                max_retries=1,
+                priority=4,
+                dependencies={PhaseType.WEB_SCAN, PhaseType.PORT_SCAN},
+                parameters={
+                    "nuclei_templates": ["cves/critical", "exposures/configs"],
+                    "custom_payloads": False,
+                    "deep_scan": False
+                }
+            ),
+            PhaseType.AI_ANALYSIS: PhaseConfig(enabled=False),
+            PhaseType.EXPLOIT_GENERATION: PhaseConfig(enabled=False)
+        }
+    )
+    
+    # STANDARD Profile - Balanced speed and coverage
+    standard_profile = ScanProfile(
+        name="Standard Scan",
+        description="Balanced security assessment with good coverage",
+        scan_type=ScanType.STANDARD,
+        estimated_duration_minutes=15,
+        max_concurrent_phases=3,
+        overall_timeout_minutes=30,
+        enable_caching=True,
+        enable_ai_analysis=True,
+        cpu_intensive_limit=2,
+        network_request_limit=200,
+        memory_limit_mb=512,
+        include_exploits=False,
+        phases={
+            PhaseType.RECONNAISSANCE: PhaseConfig(
+                enabled=True,
+                timeout_seconds=180,
+                max_retries=2,
+                priority=1,
+                parameters={
+                    "dns_enumeration": True,
+                    "subdomain_discovery": True,
+                    "certificate_transparency": True,
+                    "whois_lookup": True,
+                    "max_subdomains": 20,
+                    "passive_recon": True
+                }
+            ),
+            PhaseType.PORT_SCAN: PhaseConfig(
+                enabled=True,
+                timeout_seconds=300,
+                max_retries=2,
+                priority=2,
+                dependencies={PhaseType.RECONNAISSANCE},
+                parameters={
+                    "port_range": "1-10000",
+                    "scan_type": "syn",
+                    "timing": "normal",
+                    "service_detection": True,
+                    "version_detection": True
+                }
+            ),
+            PhaseType.WEB_SCAN: PhaseConfig(
+                enabled=True,
+                timeout_seconds=240,
+                max_retries=2,
+                priority=3,
+                parallel_execution=True,
+                dependencies={PhaseType.PORT_SCAN},
+                parameters={
+                    "check_ssl": True,
+                    "check_headers": True,
+                    "directory_bruteforce": True,
+                    "technology_detection": True,
+                    "max_paths": 50,
+                    "check_robots_txt": True,
+                    "check_sitemap": True
+                }
+            ),
+            PhaseType.VULNERABILITY_SCAN: PhaseConfig(
+                enabled=True,
+                timeout_seconds=450,
+                max_retries=2,
+                priority=4,
+                dependencies={PhaseType.WEB_SCAN, PhaseType.PORT_SCAN},
+                parameters={
+                    "nuclei_templates": ["cves/", "vulnerabilities/", "misconfiguration/"],
+                    "custom_payloads": True,
+                    "deep_scan": False,
+                    "severity_filter": ["critical", "high", "medium"]
+                }
+            ),
+            PhaseType.AI_ANALYSIS: PhaseConfig(
+                enabled=True,
+                timeout_seconds=120,
+                max_retries=1,
+                priority=5,
+                dependencies={PhaseType.VULNERABILITY_SCAN},
+                parameters={
+                    "model": "gpt-4-turbo",
+                    "analysis_depth": "standard",
+                    "include_business_context": False
+                }
+            ),
+            PhaseType.EXPLOIT_GENERATION: PhaseConfig(enabled=False)
+        }
+    )
+    
+    # COMPREHENSIVE Profile - Deep and thorough scanning
+    comprehensive_profile = ScanProfile(
+        name="Comprehensive Scan",
+        description="Thorough security assessment with deep analysis",
+        scan_type=ScanType.COMPREHENSIVE,
+        estimated_duration_minutes=45,
+        max_concurrent_phases=4,
+        overall_timeout_minutes=90,
+        enable_caching=True,
+        enable_ai_analysis=True,
+        cpu_intensive_limit=3,
+        network_request_limit=500,
+        memory_limit_mb=1024,
+        include_exploits=True,
+        detailed_logging=True,
+        phases={
+            PhaseType.RECONNAISSANCE: PhaseConfig(
+                enabled=True,
+                timeout_seconds=360,
+                max_retries=3,
+                priority=1,
+                parameters={
+                    "dns_enumeration": True,
+                    "subdomain_discovery": True,
+                    "certificate_transparency": True,
+                    "whois_lookup": True,
+                    "max_subdomains": 100,
+                    "passive_recon": True,
+                    "shodan_lookup": True,
+                    "social_media_recon": True,
+                    "email_discovery": True
+                }
+            ),
+            PhaseType.PORT_SCAN: PhaseConfig(
+                enabled=True,
+                timeout_seconds=600,
+                max_retries=3,
+                priority=2,
+                dependencies={PhaseType.RECONNAISSANCE},
+                parameters={
+                    "port_range": "1-65535",  # Full port range
+                    "scan_type": "comprehensive",
+                    "timing": "normal",
+                    "service_detection": True,
+                    "version_detection": True,
+                    "script_scanning": True,
+                    "os_detection": True
+                }
+            ),
+            PhaseType.WEB_SCAN: PhaseConfig(
+                enabled=True,
+                timeout_seconds=480,
+                max_retries=3,
+                priority=3,
+                parallel_execution=True,
+                dependencies={PhaseType.PORT_SCAN},
+                parameters={
+                    "check_ssl": True,
+                    "check_headers": True,
+                    "directory_bruteforce": True,
+                    "technology_detection": True,
+                    "max_paths": 200,
+                    "check_robots_txt": True,
+                    "check_sitemap": True,
+                    "parameter_discovery": True,
+                    "form_analysis": True,
+                    "cookie_analysis": True
+                }
+            ),
+            PhaseType.VULNERABILITY_SCAN: PhaseConfig(
+                enabled=True,
+                timeout_seconds=900,
+                max_retries=3,
+                priority=4,
+                dependencies={PhaseType.WEB_SCAN, PhaseType.PORT_SCAN},
+                parameters={
+                    "nuclei_templates": ["cves/", "vulnerabilities/", "misconfiguration/", "exposures/"],
+                    "custom_payloads": True,
+                    "deep_scan": True,
+                    "severity_filter": ["critical", "high", "medium", "low"],
+                    "authenticated_scan": True,
+                    "brute_force_checks": True
+                }
+            ),
+            PhaseType.AI_ANALYSIS: PhaseConfig(
+                enabled=True,
+                timeout_seconds=180,
+                max_retries=2,
+                priority=5,
+                dependencies={PhaseType.VULNERABILITY_SCAN},
+                parameters={
+                    "model": "gpt-4-turbo",
+                    "analysis_depth": "comprehensive",
+                    "include_business_context": True,
+                    "threat_modeling": True,
+                    "risk_assessment": True
+                }
+            ),
+            PhaseType.EXPLOIT_GENERATION: PhaseConfig(
+                enabled=True,
+                timeout_seconds=240,
+                max_retries=2,
+                priority=6,
+                dependencies={PhaseType.AI_ANALYSIS},
+                parameters={
+                    "generate_poc": True,
+                    "severity_threshold": "medium",
+                    "include_metasploit": True,
+                    "custom_exploits": True
+                }
+            )
+        }
+    )
+    
+    # STEALTH Profile - Evade detection
+    stealth_profile = ScanProfile(
+        name="Stealth Scan",
+        description="Low-profile scanning to evade detection",
+        scan_type=ScanType.STEALTH,
+        estimated_duration_minutes=60,
+        max_concurrent_phases=1,  # Sequential execution
+        overall_timeout_minutes=120,
+        enable_caching=True,
+        enable_ai_analysis=True,
+        cpu_intensive_limit=1,
+        network_request_limit=50,
+        memory_limit_mb=256,
+        include_exploits=False,
+        phases={
+            PhaseType.RECONNAISSANCE: PhaseConfig(
+                enabled=True,
+                timeout_seconds=600,
+                max_retries=1,
+                priority=1,
+                parallel_execution=False,
+                parameters={
+                    "dns_enumeration": True,
+                    "subdomain_discovery": True,
+                    "certificate_transparency": True,
+                    "whois_lookup": False,  # Avoid leaving traces
+                    "max_subdomains": 10,
+                    "passive_recon": True,
+                    "delay_between_requests": 5,  # Slow down
+                    "randomize_user_agents": True
+                }
+            ),
+            PhaseType.PORT_SCAN: PhaseConfig(
+                enabled=True,
+                timeout_seconds=1200,
+                max_retries=1,
+                priority=2,
+                parallel_execution=False,
+                dependencies={PhaseType.RECONNAISSANCE},
+                parameters={
+                    "port_range": "22,80,443,8080,8443",  # Only common ports
+                    "scan_type": "connect",  # Less suspicious
+                    "timing": "paranoid",  # Very slow
+                    "service_detection": False,
+                    "randomize_order": True,
+                    "source_port_randomization": True
+                }
+            ),
+            PhaseType.WEB_SCAN: PhaseConfig(
+                enabled=True,
+                timeout_seconds=480,
+                max_retries=1,
+                priority=3,
+                parallel_execution=False,
+                dependencies={PhaseType.PORT_SCAN},
+                parameters={
+                    "check_ssl": True,
+                    "check_headers": True,
+                    "directory_bruteforce": False,  # Too noisy
+                    "technology_detection": True,
+                    "max_paths": 5,
+                    "delay_between_requests": 3,
+                    "randomize_user_agents": True,
+                    "respect_robots_txt": True
+                }
+            ),
+            PhaseType.VULNERABILITY_SCAN: PhaseConfig(
+                enabled=True,
+                timeout_seconds=600,
+                max_retries=1,
+                priority=4,
+                parallel_execution=False,
+                dependencies={PhaseType.WEB_SCAN},
+                parameters={
+                    "nuclei_templates": ["cves/critical"],  # Only critical
+                    "custom_payloads": False,
+                    "deep_scan": False,
+                    "rate_limit": "1req/5s",
+                    "randomize_payloads": True
+                }
+            ),
+            PhaseType.AI_ANALYSIS: PhaseConfig(
+                enabled=True,
+                timeout_seconds=120,
+                priority=5,
+                dependencies={PhaseType.VULNERABILITY_SCAN},
+                parameters={
+                    "model": "gpt-3.5-turbo",  # Faster/cheaper
+                    "analysis_depth": "basic"
+                }
+            ),
+            PhaseType.EXPLOIT_GENERATION: PhaseConfig(enabled=False)
+        }
+    )
+    
+    # COMPLIANCE Profile - Focus on compliance requirements
+    compliance_profile = ScanProfile(
+        name="Compliance Scan",
+        description="Security assessment focused on compliance requirements",
+        scan_type=ScanType.COMPLIANCE,
+        estimated_duration_minutes=30,
+        max_concurrent_phases=3,
+        overall_timeout_minutes=60,
+        enable_caching=True,
+        enable_ai_analysis=True,
+        generate_report=True,
+        detailed_logging=True,
+        phases={
+            PhaseType.RECONNAISSANCE: PhaseConfig(
+                enabled=True,
+                timeout_seconds=240,
+                priority=1,
+                parameters={
+                    "dns_enumeration": True,
+                    "certificate_analysis": True,
+                    "compliance_focused": True
+                }
+            ),
+            PhaseType.PORT_SCAN: PhaseConfig(
+                enabled=True,
+                timeout_seconds=360,
+                priority=2,
+                dependencies={PhaseType.RECONNAISSANCE},
+                parameters={
+                    "port_range": "1-10000",
+                    "focus_on_compliance_ports": True,
+                    "banner_grabbing": True
+                }
+            ),
+            PhaseType.WEB_SCAN: PhaseConfig(
+                enabled=True,
+                timeout_seconds=300,
+                priority=3,
+                dependencies={PhaseType.PORT_SCAN},
+                parameters={
+                    "ssl_compliance_check": True,
+                    "security_headers_compliance": True,
+                    "cookie_security": True,
+                    "privacy_policy_check": True
+                }
+            ),
+            PhaseType.VULNERABILITY_SCAN: PhaseConfig(
+                enabled=True,
+                timeout_seconds=540,
+                priority=4,
+                dependencies={PhaseType.WEB_SCAN},
+                parameters={
+                    "compliance_templates": ["pci-dss", "gdpr", "hipaa", "sox"],
+                    "focus_on_data_protection": True,
+                    "encryption_checks": True
+                }
+            ),
+            PhaseType.AI_ANALYSIS: PhaseConfig(
+                enabled=True,
+                timeout_seconds=150,
+                priority=5,
+                dependencies={PhaseType.VULNERABILITY_SCAN},
+                parameters={
+                    "compliance_focus": True,
+                    "risk_assessment": True,
+                    "remediation_priority": "compliance_first"
+                }
+            ),
+            PhaseType.EXPLOIT_GENERATION: PhaseConfig(enabled=False)
+        }
+    )
+    
+    return {
+        ScanType.QUICK: quick_profile,
+        ScanType.STANDARD: standard_profile,
+        ScanType.COMPREHENSIVE: comprehensive_profile,
+        ScanType.STEALTH: stealth_profile,
+        ScanType.COMPLIANCE: compliance_profile,
+    }
+
+
+# Default profiles are built once at import and shared by every manager
+_DEFAULT_PROFILES: Dict[ScanType, ScanProfile] = _build_default_profiles()
 
 
 class ScanProfileManager:
     """Manages scan profiles and their configurations"""
     
     def __init__(self):
-        self.profiles: Dict[ScanType, ScanProfile] = {}
-        self._initialize_default_profiles()
-    
-    def _initialize_default_profiles(self):
-        """Initialize default scan profiles"""
-        
-        # QUICK Profile - Fast reconnaissance and basic checks
-        quick_profile = ScanProfile(
-            name="Quick Scan",
-            description="Fast reconnaissance and basic vulnerability checks",
-            scan_type=ScanType.QUICK,
-            estimated_duration_minutes=5,
-            max_concurrent_phases=2,
-            overall_timeout_minutes=10,
-            enable_caching=True,
-            enable_ai_analysis=False,  # Skip AI for speed
-            cpu_intensive_limit=1,
-            network_request_limit=50,
-            memory_limit_mb=256,
-            include_exploits=False,
-            phases={
-                PhaseType.RECONNAISSANCE: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=60,
-                    max_retries=1,
-                    priority=1,
-                    parameters={
-                        "dns_enumeration": True,
-                        "subdomain_discovery": False,  # Skip for speed
-                        "certificate_transparency": False,
-                        "whois_lookup": False,
-                        "max_subdomains": 5
-                    }
-                ),
-                PhaseType.PORT_SCAN: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=120,
-                    max_retries=1,
-                    priority=2,
-                    dependencies={PhaseType.RECONNAISSANCE},
-                    parameters={
-                        "port_range": "1-1000",  # Limited range
-                        "scan_type": "syn",
-                        "timing": "aggressive",
-                        "service_detection": False
-                    }
-                ),
-                PhaseType.WEB_SCAN: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=90,
-                    max_retries=1,
-                    priority=3,
-                    dependencies={PhaseType.PORT_SCAN},
-                    parameters={
-                        "check_ssl": True,
-                        "check_headers": True,
-                        "directory_bruteforce": False,
-                        "technology_detection": True,
-                        "max_paths": 10
-                    }
-                ),
-                PhaseType.VULNERABILITY_SCAN: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=180,
-                    max_retries=1,
-                    priority=4,
-                    dependencies={PhaseType.WEB_SCAN, PhaseType.PORT_SCAN},
-                    parameters={
-                        "nuclei_templates": ["cves/critical", "exposures/configs"],
-                        "custom_payloads": False,
-                        "deep_scan": False
-                    }
-                ),
-                PhaseType.AI_ANALYSIS: PhaseConfig(enabled=False),
-                PhaseType.EXPLOIT_GENERATION: PhaseConfig(enabled=False)
-            }
-        )
-        
-        # STANDARD Profile - Balanced speed and coverage
-        standard_profile = ScanProfile(
-            name="Standard Scan",
-            description="Balanced security assessment with good coverage",
-            scan_type=ScanType.STANDARD,
-            estimated_duration_minutes=15,
-            max_concurrent_phases=3,
-            overall_timeout_minutes=30,
-            enable_caching=True,
-            enable_ai_analysis=True,
-            cpu_intensive_limit=2,
-            network_request_limit=200,
-            memory_limit_mb=512,
-            include_exploits=False,
-            phases={
-                PhaseType.RECONNAISSANCE: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=180,
-                    max_retries=2,
-                    priority=1,
-                    parameters={
-                        "dns_enumeration": True,
-                        "subdomain_discovery": True,
-                        "certificate_transparency": True,
-                        "whois_lookup": True,
-                        "max_subdomains": 20,
-                        "passive_recon": True
-                    }
-                ),
-                PhaseType.PORT_SCAN: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=300,
-                    max_retries=2,
-                    priority=2,
-                    dependencies={PhaseType.RECONNAISSANCE},
-                    parameters={
-                        "port_range": "1-10000",
-                        "scan_type": "syn",
-                        "timing": "normal",
-                        "service_detection": True,
-                        "version_detection": True
-                    }
-                ),
-                PhaseType.WEB_SCAN: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=240,
-                    max_retries=2,
-                    priority=3,
-                    parallel_execution=True,
-                    dependencies={PhaseType.PORT_SCAN},
-                    parameters={
-                        "check_ssl": True,
-                        "check_headers": True,
-                        "directory_bruteforce": True,
-                        "technology_detection": True,
-                        "max_paths": 50,
-                        "check_robots_txt": True,
-                        "check_sitemap": True
-                    }
-                ),
-                PhaseType.VULNERABILITY_SCAN: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=450,
-                    max_retries=2,
-                    priority=4,
-                    dependencies={PhaseType.WEB_SCAN, PhaseType.PORT_SCAN},
-                    parameters={
-                        "nuclei_templates": ["cves/", "vulnerabilities/", "misconfiguration/"],
-                        "custom_payloads": True,
-                        "deep_scan": False,
-                        "severity_filter": ["critical", "high", "medium"]
-                    }
-                ),
-                PhaseType.AI_ANALYSIS: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=120,
-                    max_retries=1,
-                    priority=5,
-                    dependencies={PhaseType.VULNERABILITY_SCAN},
-                    parameters={
-                        "model": "gpt-4-turbo",
-                        "analysis_depth": "standard",
-                        "include_business_context": False
-                    }
-                ),
-                PhaseType.EXPLOIT_GENERATION: PhaseConfig(enabled=False)
-            }
-        )
-        
-        # COMPREHENSIVE Profile - Deep and thorough scanning
-        comprehensive_profile = ScanProfile(
-            name="Comprehensive Scan",
-            description="Thorough security assessment with deep analysis",
-            scan_type=ScanType.COMPREHENSIVE,
-            estimated_duration_minutes=45,
-            max_concurrent_phases=4,
-            overall_timeout_minutes=90,
-            enable_caching=True,
-            enable_ai_analysis=True,
-            cpu_intensive_limit=3,
-            network_request_limit=500,
-            memory_limit_mb=1024,
-            include_exploits=True,
-            detailed_logging=True,
-            phases={
-                PhaseType.RECONNAISSANCE: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=360,
-                    max_retries=3,
-                    priority=1,
-                    parameters={
-                        "dns_enumeration": True,
-                        "subdomain_discovery": True,
-                        "certificate_transparency": True,
-                        "whois_lookup": True,
-                        "max_subdomains": 100,
-                        "passive_recon": True,
-                        "shodan_lookup": True,
-                        "social_media_recon": True,
-                        "email_discovery": True
-                    }
-                ),
-                PhaseType.PORT_SCAN: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=600,
-                    max_retries=3,
-                    priority=2,
-                    dependencies={PhaseType.RECONNAISSANCE},
-                    parameters={
-                        "port_range": "1-65535",  # Full port range
-                        "scan_type": "comprehensive",
-                        "timing": "normal",
-                        "service_detection": True,
-                        "version_detection": True,
-                        "script_scanning": True,
-                        "os_detection": True
-                    }
-                ),
-                PhaseType.WEB_SCAN: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=480,
-                    max_retries=3,
-                    priority=3,
-                    parallel_execution=True,
-                    dependencies={PhaseType.PORT_SCAN},
-                    parameters={
-                        "check_ssl": True,
-                        "check_headers": True,
-                        "directory_bruteforce": True,
-                        "technology_detection": True,
-                        "max_paths": 200,
-                        "check_robots_txt": True,
-                        "check_sitemap": True,
-                        "parameter_discovery": True,
-                        "form_analysis": True,
-                        "cookie_analysis": True
-                    }
-                ),
-                PhaseType.VULNERABILITY_SCAN: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=900,
-                    max_retries=3,
-                    priority=4,
-                    dependencies={PhaseType.WEB_SCAN, PhaseType.PORT_SCAN},
-                    parameters={
-                        "nuclei_templates": ["cves/", "vulnerabilities/", "misconfiguration/", "exposures/"],
-                        "custom_payloads": True,
-                        "deep_scan": True,
-                        "severity_filter": ["critical", "high", "medium", "low"],
-                        "authenticated_scan": True,
-                        "brute_force_checks": True
-                    }
-                ),
-                PhaseType.AI_ANALYSIS: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=180,
-                    max_retries=2,
-                    priority=5,
-                    dependencies={PhaseType.VULNERABILITY_SCAN},
-                    parameters={
-                        "model": "gpt-4-turbo",
-                        "analysis_depth": "comprehensive",
-                        "include_business_context": True,
-                        "threat_modeling": True,
-                        "risk_assessment": True
-                    }
-                ),
-                PhaseType.EXPLOIT_GENERATION: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=240,
-                    max_retries=2,
-                    priority=6,
-                    dependencies={PhaseType.AI_ANALYSIS},
-                    parameters={
-                        "generate_poc": True,
-                        "severity_threshold": "medium",
-                        "include_metasploit": True,
-                        "custom_exploits": True
-                    }
-                )
-            }
-        )
-        
-        # STEALTH Profile - Evade detection
-        stealth_profile = ScanProfile(
-            name="Stealth Scan",
-            description="Low-profile scanning to evade detection",
-            scan_type=ScanType.STEALTH,
-            estimated_duration_minutes=60,
-            max_concurrent_phases=1,  # Sequential execution
-            overall_timeout_minutes=120,
-            enable_caching=True,
-            enable_ai_analysis=True,
-            cpu_intensive_limit=1,
-            network_request_limit=50,
-            memory_limit_mb=256,
-            include_exploits=False,
-            phases={
-                PhaseType.RECONNAISSANCE: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=600,
-                    max_retries=1,
-                    priority=1,
-                    parallel_execution=False,
-                    parameters={
-                        "dns_enumeration": True,
-                        "subdomain_discovery": True,
-                        "certificate_transparency": True,
-                        "whois_lookup": False,  # Avoid leaving traces
-                        "max_subdomains": 10,
-                        "passive_recon": True,
-                        "delay_between_requests": 5,  # Slow down
-                        "randomize_user_agents": True
-                    }
-                ),
-                PhaseType.PORT_SCAN: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=1200,
-                    max_retries=1,
-                    priority=2,
-                    parallel_execution=False,
-                    dependencies={PhaseType.RECONNAISSANCE},
-                    parameters={
-                        "port_range": "22,80,443,8080,8443",  # Only common ports
-                        "scan_type": "connect",  # Less suspicious
-                        "timing": "paranoid",  # Very slow
-                        "service_detection": False,
-                        "randomize_order": True,
-                        "source_port_randomization": True
-                    }
-                ),
-                PhaseType.WEB_SCAN: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=480,
-                    max_retries=1,
-                    priority=3,
-                    parallel_execution=False,
-                    dependencies={PhaseType.PORT_SCAN},
-                    parameters={
-                        "check_ssl": True,
-                        "check_headers": True,
-                        "directory_bruteforce": False,  # Too noisy
-                        "technology_detection": True,
-                        "max_paths": 5,
-                        "delay_between_requests": 3,
-                        "randomize_user_agents": True,
-                        "respect_robots_txt": True
-                    }
-                ),
-                PhaseType.VULNERABILITY_SCAN: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=600,
-                    max_retries=1,
-                    priority=4,
-                    parallel_execution=False,
-                    dependencies={PhaseType.WEB_SCAN},
-                    parameters={
-                        "nuclei_templates": ["cves/critical"],  # Only critical
-                        "custom_payloads": False,
-                        "deep_scan": False,
-                        "rate_limit": "1req/5s",
-                        "randomize_payloads": True
-                    }
-                ),
-                PhaseType.AI_ANALYSIS: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=120,
-                    priority=5,
-                    dependencies={PhaseType.VULNERABILITY_SCAN},
-                    parameters={
-                        "model": "gpt-3.5-turbo",  # Faster/cheaper
-                        "analysis_depth": "basic"
-                    }
-                ),
-                PhaseType.EXPLOIT_GENERATION: PhaseConfig(enabled=False)
-            }
-        )
-        
-        # COMPLIANCE Profile - Focus on compliance requirements
-        compliance_profile = ScanProfile(
-            name="Compliance Scan",
-            description="Security assessment focused on compliance requirements",
-            scan_type=ScanType.COMPLIANCE,
-            estimated_duration_minutes=30,
-            max_concurrent_phases=3,
-            overall_timeout_minutes=60,
-            enable_caching=True,
-            enable_ai_analysis=True,
-            generate_report=True,
-            detailed_logging=True,
-            phases={
-                PhaseType.RECONNAISSANCE: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=240,
-                    priority=1,
-                    parameters={
-                        "dns_enumeration": True,
-                        "certificate_analysis": True,
-                        "compliance_focused": True
-                    }
-                ),
-                PhaseType.PORT_SCAN: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=360,
-                    priority=2,
-                    dependencies={PhaseType.RECONNAISSANCE},
-                    parameters={
-                        "port_range": "1-10000",
-                        "focus_on_compliance_ports": True,
-                        "banner_grabbing": True
-                    }
-                ),
-                PhaseType.WEB_SCAN: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=300,
-                    priority=3,
-                    dependencies={PhaseType.PORT_SCAN},
-                    parameters={
-                        "ssl_compliance_check": True,
-                        "security_headers_compliance": True,
-                        "cookie_security": True,
-                        "privacy_policy_check": True
-                    }
-                ),
-                PhaseType.VULNERABILITY_SCAN: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=540,
-                    priority=4,
-                    dependencies={PhaseType.WEB_SCAN},
-                    parameters={
-                        "compliance_templates": ["pci-dss", "gdpr", "hipaa", "sox"],
-                        "focus_on_data_protection": True,
-                        "encryption_checks": True
-                    }
-                ),
-                PhaseType.AI_ANALYSIS: PhaseConfig(
-                    enabled=True,
-                    timeout_seconds=150,
-                    priority=5,
-                    dependencies={PhaseType.VULNERABILITY_SCAN},
-                    parameters={
-                        "compliance_focus": True,
-                        "risk_assessment": True,
-                        "remediation_priority": "compliance_first"
-                    }
-                ),
-                PhaseType.EXPLOIT_GENERATION: PhaseConfig(enabled=False)
-            }
-        )
-        
-        # Store profiles
-        self.profiles[ScanType.QUICK] = quick_profile
-        self.profiles[ScanType.STANDARD] = standard_profile
-        self.profiles[ScanType.COMPREHENSIVE] = comprehensive_profile
-        self.profiles[ScanType.STEALTH] = stealth_profile
-        self.profiles[ScanType.COMPLIANCE] = compliance_profile
+        self.profiles: Dict[ScanType, ScanProfile] = dict(_DEFAULT_PROFILES)
+        self._profiles_view: Mapping[ScanType, ScanProfile] = MappingProxyType(self.profiles)
         
+        # Summary cache, rebuilt when the profile version moves on
+        self._profiles_version = 0
+        self._summary_cache: Optional[Dict[str, Dict[str, Any]]] = None
+        self._summary_version = -1
         logger.info(f"Initialized {len(self.profiles)} scan profiles")
     
+    def register_profile(self, profile: ScanProfile):
+        """Add or replace the profile stored for its scan type"""
+        self.profiles[profile.scan_type] = profile
+        self._profiles_version += 1
+    
     def get_profile(self, scan_type: ScanType) -> Optional[ScanProfile]:
         """Get scan profile by type"""
         return self.profiles.get(scan_type)
     
-    def get_all_profiles(self) -> Dict[ScanType, ScanProfile]:
-        """Get all available profiles"""
-        return self.profiles.copy()
+    def get_all_profiles(self) -> Mapping[ScanType, ScanProfile]:
+        """Get a read-only view of all available profiles"""
+        return self._profiles_view
     
     def create_custom_profile(
         self,
@@ -555,41 +756,54 @@ class ScanProfileManager:
         if not base:
             raise ValueError(f"Base profile {base_profile} not found")
         
-        # Create copy of base profile
-        custom_profile = ScanProfile(
-            name=name,
-            description=description,
-            scan_type=ScanType.TARGETED,
-            estimated_duration_minutes=base.estimated_duration_minutes,
-            phases=base.phases.copy(),
-            max_concurrent_phases=base.max_concurrent_phases,
-            overall_timeout_minutes=base.overall_timeout_minutes,
-            enable_caching=base.enable_caching,
-            enable_ai_analysis=base.enable_ai_analysis,
-            cpu_intensive_limit=base.cpu_intensive_limit,
-            network_request_limit=base.network_request_limit,
-            memory_limit_mb=base.memory_limit_mb,
-            generate_report=base.generate_report,
-            include_exploits=base.include_exploits,
-            detailed_logging=base.detailed_logging
-        )
+        changes: Dict[str, Any] = {
+            "name": name,
+            "description": description,
+            "scan_type": ScanType.TARGETED
+        }
         
         # Apply modifications
         if modifications:
+            modifications = dict(modifications)
+            phase_changes = modifications.pop("phases", None)
+            if phase_changes:
+                # Only phases named in the modifications are copied; the rest stay shared with the base
+                phases = base.phases.copy()
+                for phase_type, change in phase_changes.items():
+                    if isinstance(change, PhaseConfig):
+                        phases[phase_type] = change
+                    else:
+                        base_phase = phases.get(phase_type) or PhaseConfig()
+                        phases[phase_type] = _clone_phase(base_phase, change)
+                changes["phases"] = phases
+            
             for key, value in modifications.items():
-                if hasattr(custom_profile, key):
-                    setattr(custom_profile, key, value)
+                if key in _SCAN_PROFILE_FIELDS:
+                    changes[key] = value
                 else:
                     logger.warning(f"Unknown profile attribute: {key}")
         
-        return custom_profile
+        # Profiles are frozen, so the copy is built in one go from the base
+        return replace(base, **changes)
     
     def get_profile_summary(self) -> Dict[str, Any]:
         """Get summary of all profiles"""
+        if self._summary_version != self._profiles_version:
+            self._summary_cache = self._build_profile_summary()
+            self._summary_version = self._profiles_version
+        
+        # Fresh dicts and lists per call, so caller changes never reach the cache
+        return {
+            scan_type: {**entry, "enabled_phases": list(entry["enabled_phases"])}
+            for scan_type, entry in self._summary_cache.items()
+        }
+    
+    def _build_profile_summary(self) -> Dict[str, Dict[str, Any]]:
+        """Build the cached profile summary"""
         summary = {}
         
         for scan_type, profile in self.profiles.items():
-            enabled_phases = [phase.name for phase, config in profile.phases.items() if config.enabled]
+            enabled_phases = tuple(phase.name for phase in profile.enabled_phases)
             
             summary[scan_type.value] = {
                 "name": profile.name,
@@ -607,31 +821,36 @@ class ScanProfileManager:
         """Validate profile configuration and return any issues"""
         issues = []
         
+        # One fresh pass over the phases, so validation never relies on derived caches
+        enabled_phases = []
+        total_phase_timeout = 0
+        for phase_type, config in profile.phases.items():
+            if config.enabled:
+                enabled_phases.append(phase_type)
+                total_phase_timeout += config.timeout_seconds
+        enabled = set(enabled_phases)
+        
         # Check if at least one phase is enabled
-        enabled_phases = [phase for phase, config in profile.phases.items() if config.enabled]
-        if not enabled_phases:
+        if not enabled:
             issues.append("No phases are enabled")
         
-        # Check for circular dependencies
-        for phase_type, config in profile.phases.items():
-            if not config.enabled:
-                continue
-                
-            if phase_type in config.dependencies:
+        # Check for self dependencies and dependencies on disabled phases
+        for phase_type in enabled_phases:
+            dependencies = profile.phases[phase_type].dependencies
+            if phase_type in dependencies:
                 issues.append(f"Phase {phase_type.value} has circular dependency on itself")
             
-            # Check if dependencies are enabled
-            for dep in config.dependencies:
-                if dep not in profile.phases or not profile.phases[dep].enabled:
-                    issues.append(f"Phase {phase_type.value} depends on disabled phase {dep.value}")
+            for dep in dependencies - enabled:
+                issues.append(f"Phase {phase_type.value} depends on disabled phase {dep.value}")
+        
+        # Check for longer dependency cycles
+        for phase_type in _find_cycle_phases(profile.phases, enabled):
+            issues.append(f"Phase {phase_type.value} is part of a circular dependency")
         
         # Check timeout values
         if profile.overall_timeout_minutes <= 0:
             issues.append("Overall timeout must be positive")
         
-        total_phase_timeout = sum(
-            config.timeout_seconds for config in profile.phases.values() if config.enabled
-        )
         if total_phase_timeout > profile.overall_timeout_minutes * 60:
             issues.append("Sum of phase timeouts exceeds overall timeout")
         
@@ -35,5 +35,4 @@ def get_db_metrics():
 
 def get_db_health():
     """Get database health status"""
-    import asyncio
-    return asyncio.run(connection_manager.health_check())
\ No newline at end of file
+    return connection_manager.check_health()
\ No newline at end of file
@@ -31,6 +31,17 @@ app.include_router(scans.router, prefix="/api/scans", tags=["scans"])
 app.include_router(reports.router, prefix="/api/reports", tags=["reports"])
 app.include_router(websocket.router, prefix="/api/websocket", tags=["websocket"])
 
+@app.on_event("startup")
+async def start_database_monitoring():
+    """Run database monitoring on the application event loop"""
+    from app.database import connection_manager
+    connection_manager.start_monitoring()
+
+@app.on_event("shutdown")
+async def stop_database_monitoring():
+    from app.database import connection_manager
+    connection_manager.stop_monitoring()
+
 @app.get("/")
 async def root():
     return {"message": "PHANTOM Security AI API", "status": "running"}
@@ -0,0 +1,259 @@
+"""
+Unit tests for the intelligent cache manager
+"""
+
+import pytest
+import pytest_asyncio
+import asyncio
+import gzip
+import zlib
+from fnmatch import fnmatchcase
+
+from app.core.cache.cache_manager import (
+    IntelligentCacheManager, CacheLevel, CacheConfig, CompressionType
+)
+
+
+class FakePipeline:
+    """Minimal non-transactional Redis pipeline"""
+    
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.commands = []
+    
+    def setex(self, key, ttl, value):
+        self.commands.append((key, ttl, value))
+    
+    async def execute(self):
+        self.redis_client.batches.append(len(self.commands))
+        await asyncio.sleep(0)
+        for key, ttl, value in self.commands:
+            await self.redis_client.setex(key, ttl, value)
+        return [True] * len(self.commands)
+
+
+class FakeRedis:
+    """In-memory stand-in for the async Redis client"""
+    
+    def __init__(self):
+        self.store = {}
+        self.batches = []
+    
+    async def get(self, key):
+        return self.store.get(key)
+    
+    async def setex(self, key, ttl, value):
+        self.store[key] = value
+        return True
+    
+    async def delete(self, *keys):
+        return sum(self.store.pop(key, None) is not None for key in keys)
+    
+    async def keys(self, pattern):
+        return [key for key in self.store if fnmatchcase(key, pattern)]
+    
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+    
+    async def close(self):
+        pass
+
+
+@pytest_asyncio.fixture
+async def cache():
+    """Cache manager backed by a fake Redis client"""
+    manager = IntelligentCacheManager()
+    manager.redis_client = FakeRedis()
+    manager.enabled = True
+    yield manager
+    await manager.close()
+
+
+class TestWriteBehindQueue:
+    """Test write-behind batching of Redis writes"""
+    
+    @pytest.mark.asyncio
+    async def test_set_is_flushed_to_redis(self, cache):
+        """Test a queued write reaches Redis once the queue drains"""
+        await cache.set(CacheLevel.DNS_RECORDS, "example.com", {"a": ["1.2.3.4"]})
+        assert cache.local_cache
+        
+        await cache._write_queue.join()
+        
+        cache_key = cache._generate_cache_key(CacheLevel.DNS_RECORDS, "example.com")
+        stored = cache._deserialize(cache.redis_client.store[cache_key])
+        assert stored["data"] == {"a": ["1.2.3.4"]}
+        assert stored["cache_level"] == CacheLevel.DNS_RECORDS.value
+    
+    @pytest.mark.asyncio
+    async def test_writes_are_batched(self, cache):
+        """Test queued writes are flushed in pipelines of write_batch_size"""
+        cache.write_batch_size = 2
+        for i in range(5):
+            await cache.set(CacheLevel.PORT_SCAN, f"host{i}.example.com", {"open": [i]})
+        
+        await cache._write_queue.join()
+        
+        assert cache.redis_client.batches == [2, 2, 1]
+        assert len(cache.redis_client.store) == 5
+    
+    @pytest.mark.asyncio
+    async def test_full_queue_writes_synchronously(self, cache):
+        """Test set() writes straight to Redis when the queue is full"""
+        cache._write_queue = asyncio.Queue(maxsize=1)
+        cache._write_queue.put_nowait(("phantom:queued", b"{}", 60))
+        
+        await cache.set(CacheLevel.DNS_RECORDS, "example.com", {"a": ["1.2.3.4"]})
+        
+        cache_key = cache._generate_cache_key(CacheLevel.DNS_RECORDS, "example.com")
+        assert cache_key in cache.redis_client.store
+        assert cache.redis_client.batches == []
+        
+        await cache._write_queue.join()
+        assert "phantom:queued" in cache.redis_client.store
+    
+    @pytest.mark.asyncio
+    async def test_close_flushes_pending_writes(self, cache):
+        """Test close() waits for queued writes"""
+        await cache.set(CacheLevel.DNS_RECORDS, "example.com", {"a": ["1.2.3.4"]})
+        await cache.close()
+        
+        assert len(cache.redis_client.store) == 1
+
+
+class TestSerialization:
+    """Test per-level serializers and payload sniffing"""
+    
+    def test_small_payload_is_not_compressed(self):
+        """Test payloads under the threshold are stored as plain JSON"""
+        serialize = IntelligentCacheManager._build_serializer(
+            CacheConfig(ttl_seconds=60, compress=True, compress_threshold_bytes=1024)
+        )
+        payload, compressed = serialize({"data": "x"})
+        
+        assert compressed is False
+        assert payload.startswith(b"{")
+        assert IntelligentCacheManager._deserialize(payload) == {"data": "x"}
+    
+    def test_zlib_compression(self):
+        """Test payloads over the threshold are zlib-compressed and sniffed back"""
+        serialize = IntelligentCacheManager._build_serializer(
+            CacheConfig(ttl_seconds=60, compress=True, compress_threshold_bytes=64)
+        )
+        data = {"data": "x" * 500}
+        payload, compressed = serialize(data)
+        
+        assert compressed is True
+        assert zlib.decompress(payload)
+        assert IntelligentCacheManager._deserialize(payload) == data
+    
+    def test_gzip_compression(self):
+        """Test gzip payloads are sniffed by their magic bytes"""
+        serialize = IntelligentCacheManager._build_serializer(
+            CacheConfig(
+                ttl_seconds=60, compress=True,
+                compression_type=CompressionType.GZIP, compress_threshold_bytes=64
+            )
+        )
+        data = {"data": "x" * 500}
+        payload, compressed = serialize(data)
+        
+        assert compressed is True
+        assert payload[:2] == b"\x1f\x8b"
+        assert gzip.decompress(payload)
+        assert IntelligentCacheManager._deserialize(payload) == data
+    
+    def test_compression_disabled(self):
+        """Test levels without compression never compress"""
+        serialize = IntelligentCacheManager._build_serializer(
+            CacheConfig(ttl_seconds=60, compress=False, compress_threshold_bytes=0)
+        )
+        data = {"data": "x" * 500}
+        payload, compressed = serialize(data)
+        
+        assert compressed is False
+        assert IntelligentCacheManager._deserialize(payload) == data
+    
+    def test_levels_use_their_own_config(self):
+        """Test each cache level gets a serializer bound to its config"""
+        manager = IntelligentCacheManager()
+        data = {"data": "x" * 4096}
+        
+        # AI_ANALYSIS compresses large payloads, DNS_RECORDS never does
+        assert manager._serializers[CacheLevel.AI_ANALYSIS](data)[1] is True
+        assert manager._serializers[CacheLevel.DNS_RECORDS](data)[1] is False
+
+
+class TestWriteBehindInvalidation:
+    """Test invalidation against writes still queued for Redis"""
+    
+    @pytest.mark.asyncio
+    async def test_delete_after_set(self, cache):
+        """Test a queued write does not restore a deleted key"""
+        await cache.set(CacheLevel.DNS_RECORDS, "example.com", {"a": ["1.2.3.4"]})
+        await cache.delete(CacheLevel.DNS_RECORDS, "example.com")
+        await cache._write_queue.join()
+        
+        assert await cache.get(CacheLevel.DNS_RECORDS, "example.com") is None
+        assert cache.redis_client.store == {}
+    
+    @pytest.mark.asyncio
+    async def test_clear_target_cache_after_set(self, cache):
+        """Test clearing a target removes queued writes for it"""
+        await cache.set(CacheLevel.DNS_RECORDS, "example.com", {"a": ["1.2.3.4"]})
+        await cache.set(CacheLevel.PORT_SCAN, "example.com", {"open": [80]})
+        await cache.set(CacheLevel.PORT_SCAN, "other.org", {"open": [22]})
+        
+        assert await cache.clear_target_cache("example.com") > 0
+        await cache._write_queue.join()
+        
+        assert await cache.get(CacheLevel.DNS_RECORDS, "example.com") is None
+        assert await cache.get(CacheLevel.PORT_SCAN, "example.com") is None
+        assert await cache.get(CacheLevel.PORT_SCAN, "other.org") is not None
+
+
+class TestSingleFlight:
+    """Test single-flight computation on cache misses"""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_compute_once(self, cache):
+        """Test concurrent callers share one computation"""
+        calls = 0
+        
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"open": [80]}
+        
+        results = await asyncio.gather(*(
+            cache.get_or_compute(CacheLevel.PORT_SCAN, "example.com", compute) for _ in range(5)
+        ))
+        assert calls == 1
+        assert all(result == {"open": [80]} for result in results)
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_is_a_miss_for_waiters(self, cache):
+        """Test cancelling the computing caller does not cancel callers waiting on it"""
+        started = asyncio.Event()
+        
+        async def slow_compute():
+            started.set()
+            await asyncio.sleep(10)
+            return {"open": [80]}
+        
+        async def fast_compute():
+            return {"open": [443]}
+        
+        leader = asyncio.create_task(cache.get_or_compute(CacheLevel.PORT_SCAN, "example.com", slow_compute))
+        await started.wait()
+        reader = asyncio.create_task(cache.get(CacheLevel.PORT_SCAN, "example.com"))
+        follower = asyncio.create_task(cache.get_or_compute(CacheLevel.PORT_SCAN, "example.com", fast_compute))
+        await asyncio.sleep(0)
+        
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        
+        assert await reader is None
+        assert await follower == {"open": [443]}
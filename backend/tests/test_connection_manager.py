@@ -0,0 +1,283 @@
+"""
+Unit tests for the database connection manager
+"""
+
+import pytest
+import asyncio
+import threading
+from unittest.mock import Mock, patch
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.database import connection_manager as connection_module
+from app.core.database.connection_manager import (
+    DatabaseConnectionManager, ConnectionPoolConfig, SLOW_QUERY_MS
+)
+from app.core.error_handling.exceptions import DatabaseException
+
+
+def _sqlite_create_engine(*args, **kwargs):
+    """create_engine without the libpq timeouts sqlite does not accept"""
+    kwargs.pop("connect_args", None)
+    return create_engine(*args, **kwargs)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Connection manager on a file-backed sqlite database"""
+    with patch.object(connection_module, "create_engine", _sqlite_create_engine):
+        db = DatabaseConnectionManager(
+            f"sqlite:///{tmp_path / 'test.db'}",
+            ConnectionPoolConfig(pool_size=2, max_overflow=2, enable_monitoring=False)
+        )
+    db.execute_query("CREATE TABLE items (name TEXT)")
+    yield db
+    db.close()
+
+
+def _count_items(db):
+    """Count rows in the items table on a fresh session"""
+    with db.get_session(readonly=True) as session:
+        return session.execute(text("SELECT COUNT(*) FROM items")).scalar()
+
+
+class TestSessionScope:
+    """Test per-context session sharing"""
+    
+    def test_nested_sessions_are_shared(self, manager):
+        """Test nested get_session calls reuse the outer session"""
+        with manager.get_session() as outer:
+            with manager.get_session() as inner:
+                assert inner is outer
+        
+        assert manager._current_session.get() is None
+    
+    def test_sequential_sessions_are_fresh(self, manager):
+        """Test each outermost get_session opens a new session"""
+        with manager.get_session() as first:
+            pass
+        with manager.get_session() as second:
+            pass
+        
+        assert first is not second
+    
+    def test_threads_get_their_own_session(self, manager):
+        """Test concurrent threads never share a session"""
+        barrier = threading.Barrier(2)
+        sessions = []
+        
+        def worker():
+            with manager.get_session(readonly=True) as session:
+                barrier.wait(timeout=5)
+                sessions.append(session)
+        
+        threads = [threading.Thread(target=worker) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert len(sessions) == 2
+        assert sessions[0] is not sessions[1]
+    
+    def test_session_commits_on_success(self, manager):
+        """Test the outermost session commits when the block succeeds"""
+        with manager.get_session() as session:
+            session.execute(text("INSERT INTO items VALUES ('a')"))
+        
+        assert _count_items(manager) == 1
+    
+    def test_session_error_rolls_back(self, manager):
+        """Test errors roll back and surface as DatabaseException"""
+        with pytest.raises(DatabaseException):
+            with manager.get_session() as session:
+                session.execute(text("INSERT INTO items VALUES ('a')"))
+                raise ValueError("boom")
+        
+        assert _count_items(manager) == 0
+        assert manager.metrics.query_errors == 1
+        assert manager._current_session.get() is None
+    
+    def test_nested_execute_query_does_not_commit(self, manager):
+        """Test execute_query inside get_session leaves the commit to the outer block"""
+        with pytest.raises(DatabaseException):
+            with manager.get_session():
+                manager.execute_query("INSERT INTO items VALUES ('a')")
+                raise ValueError("boom")
+        
+        assert _count_items(manager) == 0
+    
+    def test_execute_query_commits_on_its_own(self, manager):
+        """Test a standalone execute_query commits its write"""
+        manager.execute_query("INSERT INTO items VALUES ('a')")
+        
+        assert _count_items(manager) == 1
+
+
+class TestAsyncSessionScope:
+    """Test per-task async session sharing"""
+    
+    @pytest.mark.asyncio
+    async def test_nested_async_sessions_are_shared(self, manager):
+        """Test nested get_async_session calls reuse the outer session"""
+        async with manager.get_async_session() as outer:
+            async with manager.get_async_session() as inner:
+                assert inner is outer
+        
+        assert manager._current_async_session.get() is None
+        await manager.close_async()
+    
+    @pytest.mark.asyncio
+    async def test_tasks_get_their_own_session(self, manager):
+        """Test concurrent tasks never share an async session"""
+        async def open_session():
+            async with manager.get_async_session() as session:
+                await asyncio.sleep(0.01)
+                return session
+        
+        first, second = await asyncio.gather(open_session(), open_session())
+        
+        assert first is not second
+        await manager.close_async()
+
+
+class TestHealthProbe:
+    """Test the reserved health check connection"""
+    
+    def test_health_check_reuses_connection(self, manager):
+        """Test consecutive probes share one unpooled connection"""
+        assert manager.check_health()["healthy"] is True
+        conn = manager._health_conn
+        assert manager.check_health()["healthy"] is True
+        
+        assert conn is not None
+        assert manager._health_conn is conn
+        assert manager.metrics.last_health_check is not None
+    
+    def test_health_check_skips_the_pool(self, manager):
+        """Test probes never check a connection out of the main pool"""
+        checkouts = manager.metrics.total_checkouts
+        manager.check_health()
+        
+        assert manager.metrics.total_checkouts == checkouts
+    
+    def test_stale_connection_is_replaced(self, manager):
+        """Test a broken health connection is discarded and the probe retried"""
+        stale = Mock()
+        stale.execute.side_effect = OperationalError("SELECT 1", {}, Exception("gone"))
+        manager._health_conn = stale
+        
+        assert manager.check_health()["healthy"] is True
+        stale.close.assert_called_once()
+        assert manager._health_conn is not stale
+    
+    def test_failed_probe_is_unhealthy(self, manager):
+        """Test a probe failing twice reports unhealthy without keeping the connection"""
+        engine = Mock()
+        engine.connect.side_effect = OperationalError("SELECT 1", {}, Exception("down"))
+        manager._health_engine = engine
+        
+        health = manager.check_health()
+        
+        assert health["healthy"] is False
+        assert engine.connect.call_count == 2
+        assert manager._health_conn is None
+        assert manager.metrics.connection_errors == 1
+    
+    @pytest.mark.asyncio
+    async def test_async_health_check(self, manager):
+        """Test the async health check runs the probe off the event loop"""
+        health = await manager.health_check()
+        
+        assert health["healthy"] is True
+
+
+class TestQuerySamples:
+    """Test thread-local query sample buffering"""
+    
+    def test_samples_are_buffered(self, manager):
+        """Test samples below the flush threshold stay in the thread buffer"""
+        manager.reset_metrics()
+        manager._record_query_sample(5.0)
+        
+        assert len(manager._tls.query_samples) == 1
+        assert len(manager.query_times) == 0
+    
+    def test_full_buffer_is_drained(self, manager):
+        """Test reaching the flush threshold folds samples into the window"""
+        manager.reset_metrics()
+        manager.sample_flush_threshold = 4
+        for _ in range(4):
+            manager._record_query_sample(2.0)
+        
+        assert len(manager._tls.query_samples) == 0
+        assert list(manager.query_times) == [2.0] * 4
+        assert manager.metrics.average_query_time_ms == 2.0
+    
+    def test_dead_thread_buffer_is_drained_and_pruned(self, manager):
+        """Test samples of an exited thread are kept and its buffer dropped"""
+        manager.reset_metrics()
+        thread = threading.Thread(target=manager._record_query_sample, args=(7.0,))
+        thread.start()
+        thread.join()
+        assert thread.ident in manager._tls_buffers
+        
+        manager._drain_query_samples()
+        
+        assert thread.ident not in manager._tls_buffers
+        assert list(manager.query_times) == [7.0]
+    
+    def test_fold_keeps_running_sum(self, manager):
+        """Test the running sum tracks the window as old samples are evicted"""
+        manager.reset_metrics()
+        maxlen = manager.query_times.maxlen
+        manager._fold_query_samples([1.0] * maxlen)
+        manager._fold_query_samples([3.0] * (maxlen // 2))
+        
+        assert len(manager.query_times) == maxlen
+        assert manager._query_sum == pytest.approx(sum(manager.query_times))
+        assert manager.metrics.average_query_time_ms == pytest.approx(2.0)
+    
+    def test_slow_queries_are_counted(self, manager):
+        """Test samples over SLOW_QUERY_MS increment slow_query_count"""
+        manager.reset_metrics()
+        manager._fold_query_samples([SLOW_QUERY_MS + 1, SLOW_QUERY_MS - 1, SLOW_QUERY_MS * 2])
+        
+        assert manager.metrics.slow_query_count == 2
+    
+    def test_queries_record_samples(self, manager):
+        """Test executed queries feed the query time window"""
+        manager.reset_metrics()
+        manager.execute_query("SELECT 1", readonly=True)
+        
+        metrics = manager.get_metrics()
+        
+        assert len(manager.query_times) >= 1
+        assert metrics["performance"]["average_query_time_ms"] >= 0
+
+
+class TestMetrics:
+    """Test memoized metrics snapshots"""
+    
+    def test_metrics_are_memoized(self, manager):
+        """Test unchanged metrics return the cached snapshot"""
+        manager.metrics_cache_ttl = 60
+        
+        assert manager.get_metrics() is manager.get_metrics()
+    
+    def test_metrics_refresh_after_change(self, manager):
+        """Test a metrics change invalidates the cached snapshot"""
+        manager.metrics_cache_ttl = 60
+        before = manager.get_metrics()
+        manager._update_query_time(SLOW_QUERY_MS + 1)
+        after = manager.get_metrics()
+        
+        assert after is not before
+        assert after["performance"]["slow_query_count"] == before["performance"]["slow_query_count"] + 1
+    
+    def test_metrics_refresh_after_ttl(self, manager):
+        """Test the cached snapshot expires after metrics_cache_ttl"""
+        manager.metrics_cache_ttl = 0
+        
+        assert manager.get_metrics() is not manager.get_metrics()
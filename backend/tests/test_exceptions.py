@@ -0,0 +1,112 @@
+"""
+Unit tests for PHANTOM exception classes and helpers
+"""
+
+import copy
+import pickle
+
+import pytest
+
+from app.core.error_handling.exceptions import (
+    PhantomBaseException, ErrorCategory, ErrorSeverity, ErrorContext, EMPTY_ERROR_CONTEXT,
+    AuthenticationException, AuthorizationException, ExternalServiceException,
+    NetworkException, TimeoutException, ScanTimeoutException, RateLimitException,
+    CircuitOpenException, ValidationException, DatabaseException,
+    wrap_external_exception, is_retryable_error, get_retry_delay
+)
+
+
+class TestPhantomBaseException:
+    """Test PhantomBaseException defaults and serialization"""
+    
+    def test_class_defaults(self):
+        """Test category, severity and error code come from the class"""
+        exc = ScanTimeoutException("scan-1", 5.0)
+        assert exc.category is ErrorCategory.TIMEOUT
+        assert exc.severity is ErrorSeverity.HIGH
+        assert exc.error_code == "TIMEOUT_SCANTIMEOUT"
+        assert exc.user_message == "The operation timed out. Please try again."
+    
+    def test_explicit_category_overrides_default(self):
+        """Test an explicit category generates its own error code"""
+        exc = PhantomBaseException("boom", category=ErrorCategory.SYSTEM)
+        assert exc.category is ErrorCategory.SYSTEM
+        assert exc.error_code == "SYSTEM_PHANTOMBASE"
+        assert exc.severity is ErrorSeverity.MEDIUM
+    
+    def test_shared_empty_context(self):
+        """Test exceptions without context share the read-only empty context"""
+        exc = NetworkException("down")
+        assert exc.context is EMPTY_ERROR_CONTEXT
+        with pytest.raises(TypeError):
+            exc.context.metadata["key"] = "value"
+    
+    def test_to_dict(self):
+        """Test dictionary envelope contents"""
+        context = ErrorContext(correlation_id="corr-1", operation="scan")
+        exc = ValidationException("bad input", context=context, cause=ValueError("nope"))
+        data = exc.to_dict()
+        assert data["category"] == "validation"
+        assert data["severity"] == "medium"
+        assert data["context"]["correlation_id"] == "corr-1"
+        assert data["caused_by"] == "nope"
+        assert data["timestamp"] == exc.timestamp.isoformat()
+    
+    def test_traceback_from_cause(self):
+        """Test traceback is formatted from the cause"""
+        try:
+            raise ValueError("root cause")
+        except ValueError as e:
+            exc = ExternalServiceException("svc", "failed", cause=e)
+        assert "ValueError: root cause" in exc.traceback_str
+    
+    def test_pickle_round_trip(self):
+        """Test pickling and copying keep every field"""
+        exc = DatabaseException(
+            "x", retry_after=5, context=ErrorContext(correlation_id="c"), error_code="E1"
+        )
+        for restored in (pickle.loads(pickle.dumps(exc)), copy.copy(exc), copy.deepcopy(exc)):
+            assert type(restored) is DatabaseException
+            assert restored.message == "x"
+            assert restored.retry_after == 5
+            assert restored.context.correlation_id == "c"
+            assert restored.error_code == "E1"
+            assert restored.timestamp == exc.timestamp
+    
+    def test_pickle_keeps_shared_empty_context(self):
+        """Test the shared empty context survives pickling as the same object"""
+        restored = pickle.loads(pickle.dumps(ValidationException("bad input")))
+        assert restored.context is EMPTY_ERROR_CONTEXT
+
+
+class TestExceptionHelpers:
+    """Test exception helper functions"""
+    
+    def test_wrap_by_type(self):
+        """Test built-in exception types map to PHANTOM exceptions"""
+        assert isinstance(wrap_external_exception(TimeoutError(), "svc", "op"), TimeoutException)
+        assert isinstance(wrap_external_exception(ConnectionResetError(), "svc", "op"), NetworkException)
+    
+    def test_wrap_by_message(self):
+        """Test message keywords select the wrapper"""
+        assert isinstance(wrap_external_exception(ValueError("401 Unauthorized"), "svc", "op"), AuthenticationException)
+        assert isinstance(wrap_external_exception(ValueError("403 FORBIDDEN"), "svc", "op"), AuthorizationException)
+        
+        wrapped = wrap_external_exception(ValueError("boom"), "svc", "op")
+        assert isinstance(wrapped, ExternalServiceException)
+        assert wrapped.service_name == "svc"
+    
+    def test_is_retryable_error(self):
+        """Test retryable classification"""
+        assert is_retryable_error(NetworkException("down"))
+        assert is_retryable_error(TimeoutError())
+        assert not is_retryable_error(ValidationException("bad"))
+        assert not is_retryable_error(ValueError())
+    
+    def test_get_retry_delay(self):
+        """Test recommended retry delays"""
+        assert get_retry_delay(NetworkException("down"), 1) == 10
+        assert get_retry_delay(NetworkException("down"), 20) == 300
+        assert get_retry_delay(CircuitOpenException("svc", retry_after=0), 2) == 60
+        assert get_retry_delay(RateLimitException("slow", retry_after=15), 3) == 15
+        assert get_retry_delay(ValueError(), 1) is None
@@ -0,0 +1,207 @@
+"""
+Unit tests for PHANTOM scan profiles
+"""
+
+import copy
+import dataclasses
+import json
+import pickle
+
+import pytest
+
+from app.core.profiles.scan_profiles import (
+    ScanProfileManager, ScanType, PhaseType, PhaseConfig
+)
+
+
+@pytest.fixture
+def manager():
+    """Create a fresh profile manager"""
+    return ScanProfileManager()
+
+
+class TestPhaseConfig:
+    """Test phase configuration defaults"""
+    
+    def test_parameters_are_read_only(self, manager):
+        """Test phase parameters of shared profiles cannot be mutated"""
+        phase = manager.get_profile(ScanType.QUICK).phases[PhaseType.PORT_SCAN]
+        with pytest.raises(TypeError):
+            phase.parameters["timing"] = "polite"
+
+
+class TestSharedProfiles:
+    """Test the default profiles shared between managers"""
+    
+    def test_default_profiles_are_immutable(self, manager):
+        """Test profiles, their phases and phase configs cannot be mutated"""
+        profile = manager.get_profile(ScanType.QUICK)
+        with pytest.raises(AttributeError):
+            profile.overall_timeout_minutes = 1
+        with pytest.raises(TypeError):
+            profile.phases[PhaseType.PORT_SCAN] = PhaseConfig(enabled=False)
+        with pytest.raises(AttributeError):
+            profile.phases[PhaseType.PORT_SCAN].enabled = False
+        assert ScanProfileManager().get_profile(ScanType.QUICK).overall_timeout_minutes == 10
+    
+    def test_profiles_copy_and_pickle(self, manager):
+        """Test frozen profiles still support copying, pickling and asdict"""
+        profile = manager.get_profile(ScanType.STANDARD)
+        for restored in (copy.deepcopy(profile), pickle.loads(pickle.dumps(profile))):
+            assert restored == profile
+            with pytest.raises(TypeError):
+                restored.phases[PhaseType.PORT_SCAN].parameters["timing"] = "polite"
+        
+        data = dataclasses.asdict(profile)
+        assert data["phases"][PhaseType.PORT_SCAN]["parameters"]["port_range"] == "1-10000"
+        with pytest.raises(TypeError):
+            hash(profile)
+
+
+class TestCustomProfiles:
+    """Test custom profiles derived from the defaults"""
+    
+    def test_phase_modification_does_not_touch_base(self, manager):
+        """Test modified phases are copied and the rest are shared"""
+        base = manager.get_profile(ScanType.STANDARD)
+        custom = manager.create_custom_profile(
+            "Custom", "Custom scan",
+            modifications={"phases": {PhaseType.PORT_SCAN: {"timeout_seconds": 30, "parameters": {"timing": "polite"}}}}
+        )
+        
+        port_scan = custom.phases[PhaseType.PORT_SCAN]
+        assert port_scan.timeout_seconds == 30
+        assert port_scan.parameters["timing"] == "polite"
+        assert port_scan.parameters["port_range"] == "1-10000"
+        assert base.phases[PhaseType.PORT_SCAN].timeout_seconds == 300
+        assert base.phases[PhaseType.PORT_SCAN].parameters["timing"] == "normal"
+        assert custom.phases[PhaseType.WEB_SCAN] is base.phases[PhaseType.WEB_SCAN]
+    
+    def test_phase_config_replaces_phase(self, manager):
+        """Test a PhaseConfig modification is used as given"""
+        phase = PhaseConfig(enabled=False)
+        custom = manager.create_custom_profile(
+            "Custom", "Custom scan", modifications={"phases": {PhaseType.AI_ANALYSIS: phase}}
+        )
+        assert custom.phases[PhaseType.AI_ANALYSIS] is phase
+        assert manager.get_profile(ScanType.STANDARD).phases[PhaseType.AI_ANALYSIS].enabled
+    
+    def test_unknown_base_profile(self, manager):
+        """Test a missing base profile raises ValueError"""
+        with pytest.raises(ValueError):
+            manager.create_custom_profile("Custom", "Custom scan", base_profile=ScanType.TARGETED)
+
+
+class TestExecutionPlan:
+    """Test phase execution plans"""
+    
+    def test_default_profile_layers(self, manager):
+        """Test enabled phases are layered in dependency order"""
+        plan = manager.get_profile(ScanType.QUICK).execution_plan
+        assert plan == [
+            [PhaseType.RECONNAISSANCE], [PhaseType.PORT_SCAN],
+            [PhaseType.WEB_SCAN], [PhaseType.VULNERABILITY_SCAN]
+        ]
+    
+    def test_independent_phases_share_layer(self, manager):
+        """Test phases without mutual dependencies run in the same layer ordered by priority"""
+        custom = manager.create_custom_profile(
+            "Custom", "Custom scan",
+            modifications={"phases": {PhaseType.WEB_SCAN: {"dependencies": {PhaseType.RECONNAISSANCE}, "priority": 1}}}
+        )
+        assert custom.execution_plan[1] == [PhaseType.WEB_SCAN, PhaseType.PORT_SCAN]
+    
+    def test_cycle_raises(self, manager):
+        """Test a dependency cycle cannot be planned"""
+        custom = manager.create_custom_profile(
+            "Custom", "Custom scan",
+            modifications={"phases": {PhaseType.RECONNAISSANCE: {"dependencies": {PhaseType.WEB_SCAN}}}}
+        )
+        with pytest.raises(ValueError):
+            custom.execution_plan
+
+
+class TestValidateProfile:
+    """Test profile validation"""
+    
+    def test_default_profiles_are_valid(self, manager):
+        """Test the built-in profiles pass validation"""
+        for profile in manager.get_all_profiles().values():
+            assert manager.validate_profile(profile) == []
+    
+    def test_disabled_dependency(self, manager):
+        """Test depending on a disabled phase is reported"""
+        custom = manager.create_custom_profile(
+            "Custom", "Custom scan", modifications={"phases": {PhaseType.RECONNAISSANCE: {"enabled": False}}}
+        )
+        assert manager.validate_profile(custom) == [
+            "Phase port_scan depends on disabled phase reconnaissance"
+        ]
+    
+    def test_transitive_cycle(self, manager):
+        """Test cycles longer than a self dependency are reported"""
+        custom = manager.create_custom_profile(
+            "Custom", "Custom scan",
+            modifications={"phases": {PhaseType.RECONNAISSANCE: {"dependencies": {PhaseType.WEB_SCAN}}}}
+        )
+        issues = manager.validate_profile(custom)
+        assert len(issues) == 1
+        assert "circular dependency" in issues[0]
+    
+    def test_enabled_phase_totals(self, manager):
+        """Test enabled phases and their total timeout are derived from the phases"""
+        profile = manager.get_profile(ScanType.QUICK)
+        assert profile.enabled_phases == (
+            PhaseType.RECONNAISSANCE, PhaseType.PORT_SCAN, PhaseType.WEB_SCAN, PhaseType.VULNERABILITY_SCAN
+        )
+        assert profile.total_enabled_timeout == 450
+
+
+class TestProfileSummary:
+    """Test the cached profile summary"""
+    
+    def test_summary_is_cached_until_profiles_change(self, manager):
+        """Test the summary is rebuilt after registering a profile"""
+        summary = manager.get_profile_summary()
+        assert summary["quick"]["enabled_phases"][0] == "RECONNAISSANCE"
+        assert "targeted" not in summary
+        
+        manager.register_profile(manager.create_custom_profile("Custom", "Custom scan"))
+        assert manager.get_profile_summary()["targeted"]["name"] == "Custom"
+    
+    def test_summary_mutation_does_not_leak(self, manager):
+        """Test changing a returned summary does not affect later calls"""
+        summary = manager.get_profile_summary()
+        summary["quick"]["name"] = "Changed"
+        summary["quick"]["enabled_phases"].append("X")
+        del summary["standard"]
+        
+        fresh = manager.get_profile_summary()
+        assert fresh["quick"]["name"] == "Quick Scan"
+        assert "X" not in fresh["quick"]["enabled_phases"]
+        assert "standard" in fresh
+        assert json.loads(json.dumps(fresh)) == fresh
+
+class TestSerialization:
+    """Test profile serialization"""
+    
+    def test_profile_to_dict(self, manager):
+        """Test profiles serialize with enum values as strings"""
+        data = manager.get_profile(ScanType.STANDARD).to_dict()
+        assert data["scan_type"] == "standard"
+        assert data["phases"]["vulnerability_scan"]["dependencies"] == ["port_scan", "web_scan"]
+        assert data["phases"]["port_scan"]["parameters"]["port_range"] == "1-10000"
+        assert isinstance(data["phases"]["port_scan"]["parameters"], dict)
+
+
+class TestProfileManager:
+    """Test profile manager lookups"""
+    
+    def test_all_profiles_is_live_read_only_view(self, manager):
+        """Test get_all_profiles cannot be mutated and reflects registered profiles"""
+        profiles = manager.get_all_profiles()
+        with pytest.raises(TypeError):
+            profiles[ScanType.TARGETED] = None
+        
+        manager.register_profile(manager.create_custom_profile("Custom", "Custom scan"))
+        assert profiles[ScanType.TARGETED].name == "Custom"